@@ -11,6 +11,7 @@ from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib import messages
 from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth.decorators import login_required
+from django.http import Http404
 from .forms import AgentModelForm
 from leads.models import Agent
 
@@ -19,7 +20,10 @@ from leads.models import Agent
 
 @login_required
 def agent_update(request, pk):
-    agent = get_object_or_404(Agent, pk=pk, organisation=request.user.userprofile)
+    # vetëm organizatori ndryshon agjentët e organizatës së vet
+    if not request.tenant.is_organisor:
+        raise Http404
+    agent = get_object_or_404(Agent.objects.for_org(request.tenant.organisation_id), pk=pk)
     user = agent.user
 
     if request.method == "POST":
@@ -42,8 +46,7 @@ class AgentListView(OrganisorAndLoginRequiredMixin, generic.ListView):
     template_name = "agents/agent_list.html"
     
     def get_queryset(self):
-        organisation = self.request.user.userprofile
-        return Agent.objects.filter(organisation=organisation)
+        return Agent.objects.for_user(self.request.user).select_related("user")
 
 
 class AgentCreateView(OrganisorAndLoginRequiredMixin, generic.View):
@@ -66,7 +69,7 @@ class AgentCreateView(OrganisorAndLoginRequiredMixin, generic.View):
             # lidhe me organizatën e adminit
             Agent.objects.create(
                 user=user,
-                organisation=request.user.userprofile
+                organisation_id=request.tenant.organisation_id
             )
 
             messages.success(request, "Agjenti u krijua me sukses ✅")
@@ -81,8 +84,7 @@ class AgentDetailView(OrganisorAndLoginRequiredMixin, generic.DetailView):
     context_object_name = "agent"
 
     def get_queryset(self):
-        organisation = self.request.user.userprofile
-        return Agent.objects.filter(organisation=organisation)
+        return Agent.objects.for_user(self.request.user)
 
 
 class AgentUpdateView(OrganisorAndLoginRequiredMixin, generic.UpdateView):
@@ -91,8 +93,7 @@ class AgentUpdateView(OrganisorAndLoginRequiredMixin, generic.UpdateView):
     model = Agent  # ← e bëjmë eksplicit
 
     def get_queryset(self):
-        organisation = self.request.user.userprofile
-        return Agent.objects.filter(organisation=organisation)
+        return Agent.objects.for_user(self.request.user)
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
@@ -121,5 +122,4 @@ class AgentDeleteView(OrganisorAndLoginRequiredMixin, generic.DeleteView):
         return reverse("agents:agent-list")
 
     def get_queryset(self):
-        organisation = self.request.user.userprofile
-        return Agent.objects.filter(organisation=organisation)
+        return Agent.objects.for_user(self.request.user)
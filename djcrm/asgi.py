@@ -3,6 +3,13 @@ ASGI config for djcrm project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The notification stream (leads:notifications-stream) keeps connections open,
+so serve the app through this module, e.g.:
+
+    uvicorn djcrm.asgi:application --workers 4
+
+With more than one worker, set NOTIFICATION_BROKER to leads.pubsub.RedisBroker.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
 """
@@ -21,7 +21,7 @@ ALLOWED_HOSTS = ['*']
 # Application definition
 
 INSTALLED_APPS = [
-    'whitenoise.runserver_nostatic',
+    'servestatic.runserver_nostatic',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -41,12 +41,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'servestatic.middleware.ServeStaticMiddleware',
+    'leads.instrumentation.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'leads.tenancy.TenantMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -64,6 +66,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'leads.context_processors.notifications',
             ],
         },
     },
@@ -83,6 +86,68 @@ DATABASES = {
 }
 
 
+# p.sh. CACHE_URL=redis://127.0.0.1:6379/1 kur ka disa workers
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# sa sekonda mbahet në cache përmbledhja e njoftimeve për çdo user
+NOTIFICATION_SUMMARY_TIMEOUT = 300
+
+# sa sekonda pas njoftimit të fundit të palexuar "N leads të reja" / "U caktuan N leads"
+# një njoftim i ri i të njëjtit lloj bashkohet me të në vend që të shtohet
+NOTIFICATION_COALESCE_WINDOW = 300
+
+# `prune_notifications` heq njoftimet e lexuara më të vjetra se kaq ditë
+NOTIFICATION_RETENTION_DAYS = 30
+
+# statistikat e dashboard-it; dritarja 30-ditore lëviz, ndaj TTL mbahet i shkurtër
+DASHBOARD_STATS_TIMEOUT = 60
+
+# kodi i vendit për numrat pa prefiks ndërkombëtar ("069..." → "35569...")
+PHONE_DEFAULT_COUNTRY_CODE = env('PHONE_DEFAULT_COUNTRY_CODE', default='355')
+
+# useri (organizatori) të cilit i shkojnë leads e formës publike
+PUBLIC_LEAD_ORGANISOR = env('PUBLIC_LEAD_ORGANISOR', default='admin')
+
+# token bucket për endpoint-et publike: {scope: (burst, sekonda për rimbushje të plotë)};
+# "ip" është kova për çdo adresë, çdo emër tjetër është një kovë e përbashkët
+RATE_LIMITS = {
+    'public-lead': {'ip': (10, 60), 'global': (300, 60)},
+}
+# ku mbahen kovat; 'leads.ratelimit.MemoryStore' për një proces të vetëm
+RATE_LIMIT_STORE = {
+    'BACKEND': 'leads.ratelimit.CacheStore',
+}
+# True vetëm pas një proxy që e vendos vetë X-Forwarded-For
+RATE_LIMIT_TRUST_FORWARDED_FOR = env.bool('RATE_LIMIT_TRUST_FORWARDED_FOR', default=False)
+
+# QueryBudgetMiddleware: kërkesat me më shumë query se buxheti i view-t logohen si WARNING
+QUERY_BUDGET_DEFAULT = 30
+QUERY_BUDGETS = {
+    'leads:lead-list': 15,
+    'leads:lead-detail': 12,
+    'leads:category-list': 8,
+}
+# header-i Server-Timing (query, koha në DB, koha totale) në çdo përgjigje
+SERVER_TIMING = env.bool('SERVER_TIMING', default=True)
+
+# /metrics kërkon header-in `Authorization: Bearer <token>`; pa token lejohet vetëm
+# me DEBUG ose nga adresat/rrjetet e METRICS_ALLOWED_IPS (REMOTE_ADDR; mos vendos
+# 127.0.0.1 nëse para app-it ka një proxy në të njëjtin host).
+# Me disa workers vendos edhe PROMETHEUS_MULTIPROC_DIR (shih leads/metrics.py)
+METRICS_TOKEN = env('METRICS_TOKEN', default=None)
+METRICS_ALLOWED_IPS = env.list('METRICS_ALLOWED_IPS', default=[])
+
+# sa prefikse mban LRU-ja e autocomplete-it për çdo organizatë (për proces)
+LEAD_AUTOCOMPLETE_CACHE_SIZE = 256
+
+# pub/sub për njoftimet live (SSE); me disa workers:
+# {'BACKEND': 'leads.pubsub.RedisBroker', 'OPTIONS': {'url': 'redis://127.0.0.1:6379/0'}}
+NOTIFICATION_BROKER = {
+    'BACKEND': 'leads.pubsub.InProcessBroker',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -128,7 +193,7 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = "media_root"
 STATIC_ROOT = "static_root"
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STATICFILES_STORAGE = 'servestatic.storage.CompressedManifestStaticFilesStorage'
 
 AUTH_USER_MODEL = 'leads.User'
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
@@ -136,6 +201,9 @@ LOGIN_REDIRECT_URL = "/leads"
 LOGIN_URL = "/login"
 LOGOUT_REDIRECT_URL = "/"
 
+# "offset" (faqe me numra) ose "keyset" (Next/Previous me cursor, pa COUNT/OFFSET)
+LEAD_LIST_PAGINATION = env("LEAD_LIST_PAGINATION", default="offset")
+
 CRISPY_ALLOWED_TEMPLATE_PACKS = "tailwind"
 CRISPY_TEMPLATE_PACK = 'tailwind'
 
@@ -150,6 +218,10 @@ EMAIL_HOST_USER = env("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL", default=EMAIL_HOST_USER)
 
+# backend-i me të cilin `manage.py send_queued_mail` dërgon outbox-in
+# (None → EMAIL_BACKEND)
+OUTBOX_EMAIL_BACKEND = None
+
 
 if not DEBUG:
     SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
@@ -188,6 +260,12 @@ LOGGING = {
         'handlers': ['console'],
         'level': 'WARNING',
     },
+    'loggers': {
+        # INFO: një rresht për çdo kërkesë (view, query, db_ms, total_ms, bytes)
+        'leads.instrumentation': {
+            'level': env('REQUEST_LOG_LEVEL', default='WARNING'),
+        },
+    },
 }
 
 TAILWIND_APP_NAME = 'theme'
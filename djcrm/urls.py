@@ -3,11 +3,13 @@ from django.urls import path, include, reverse_lazy
 from django.contrib.auth import views as auth_views
 from django.conf import settings
 
-from leads.views import LandingPageView, SignupView, DashboardView
+from leads.forms import OutboxPasswordResetForm
+from leads.views import LandingPageView, SignupView, DashboardView, DashboardStatsView, metrics_view
 
 # Përdor të njëjtin view për të dyja rrotat (password-reset dhe reset-password)
 password_reset_view = auth_views.PasswordResetView.as_view(
     template_name='registration/password_reset_form.html',
+    form_class=OutboxPasswordResetForm,
     email_template_name='registration/password_reset_email.html',
     subject_template_name='registration/password_reset_subject.txt',
     success_url=reverse_lazy('password_reset_done'),
@@ -19,6 +21,8 @@ urlpatterns = [
 
     path('', LandingPageView.as_view(), name='landing-page'),
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('dashboard/stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
+    path('metrics', metrics_view, name='metrics'),
 
     path('leads/', include('leads.urls', namespace="leads")),
     path('agents/', include('agents.urls', namespace="agents")),
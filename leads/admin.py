@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import User, Lead, Agent, UserProfile, Category, FollowUp
+from . import dedup
+from .models import User, Lead, Agent, UserProfile, Category, FollowUp, OutgoingEmail, DuplicateCandidate
 
 
 
@@ -18,9 +19,33 @@ class LeadAdmin(admin.ModelAdmin):
 
 
 
+class DuplicateCandidateAdmin(admin.ModelAdmin):
+    list_display = ['lead', 'duplicate_of', 'reasons', 'score', 'dismissed', 'created_at']
+    list_filter = ['dismissed', 'reasons']
+    raw_id_fields = ['lead', 'duplicate_of']
+    actions = ['merge_into_older', 'dismiss']
+
+    @admin.action(description="Bashko te lead-i më i vjetër")
+    def merge_into_older(self, request, queryset):
+        merged = 0
+        for candidate in queryset.select_related('lead', 'duplicate_of'):
+            # njëri nga të dy mund të jetë bashkuar tashmë nga një çift tjetër
+            if Lead.objects.filter(pk__in=[candidate.lead_id, candidate.duplicate_of_id]).count() == 2:
+                dedup.merge(candidate.duplicate_of, candidate.lead)
+                merged += 1
+        self.message_user(request, f"U bashkuan {merged} leads.")
+
+    @admin.action(description="Nuk janë dublikata")
+    def dismiss(self, request, queryset):
+        queryset.update(dismissed=True)
+
+
+
 admin.site.register(Category)
 admin.site.register(User)
 admin.site.register(UserProfile)
 admin.site.register(Lead, LeadAdmin)
 admin.site.register(Agent)
 admin.site.register(FollowUp)
+admin.site.register(OutgoingEmail)
+admin.site.register(DuplicateCandidate, DuplicateCandidateAdmin)
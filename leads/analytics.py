@@ -0,0 +1,218 @@
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Agent, Lead, LeadDailyStat
+
+
+def stat_key(values, day):
+    return (
+        values["organisation_id"],
+        values["agent_id"] or 0,
+        values["category_id"] or 0,
+        day,
+    )
+
+
+def lead_events(values, old_values=None):
+    """
+    Ngjarjet e një lead-i si {çelës: Counter(created=..., converted=...)}.
+    Pa `old_values` lead-i sapo është krijuar. Kur `converted_date` ndryshon,
+    konvertimi i vjetër hiqet nga dita ku u numërua.
+    """
+    events = defaultdict(Counter)
+    if values["organisation_id"] is None:
+        return events
+    if old_values is None:
+        events[stat_key(values, timezone.localdate(values["date_added"]))]["created"] += 1
+    converted_date = values["converted_date"]
+    old_converted_date = (old_values or {}).get("converted_date")
+    if converted_date == old_converted_date:
+        return events
+    if old_converted_date:
+        events[stat_key(old_values, timezone.localdate(old_converted_date))]["converted"] -= 1
+    if converted_date:
+        events[stat_key(values, timezone.localdate(converted_date))]["converted"] += 1
+    return events
+
+
+def record(events):
+    """Shton ngjarjet në rollup: UPDATE me F(), INSERT kur dita s'ka rresht ende."""
+    for (organisation_id, agent_key, category_key, day), counts in sorted(events.items()):
+        key = {
+            "organisation_id": organisation_id,
+            "agent_key": agent_key,
+            "category_key": category_key,
+            "day": day,
+        }
+        if counts["converted"] < 0:
+            retract_conversions(key, -counts["converted"])
+            counts = Counter(created=counts["created"])
+            if not counts["created"]:
+                continue
+        increments = {
+            "created": F("created") + counts["created"],
+            "converted": F("converted") + counts["converted"],
+        }
+        if LeadDailyStat.objects.filter(**key).update(**increments):
+            continue
+        try:
+            with transaction.atomic():
+                LeadDailyStat.objects.create(
+                    **key, created=counts["created"], converted=counts["converted"]
+                )
+        except IntegrityError:
+            # një transaksion tjetër e krijoi ndërkohë
+            LeadDailyStat.objects.filter(**key).update(**increments)
+
+
+def retract_conversions(key, count):
+    """
+    Heq `count` konvertime nga dita e `key`. Konvertimi u numërua me agjentin dhe
+    kategorinë e atëhershme, që mund të kenë ndryshuar ndërkohë (p.sh. lead-i doli
+    nga "Converted" dhe u kthye): provohet bucket-i i `key`, pastaj ai i agjentit,
+    pastaj çdo bucket i ditës. Rollup-i nuk zbret kurrë nën 0.
+    """
+    stats = LeadDailyStat.objects.filter(
+        organisation_id=key["organisation_id"], day=key["day"], converted__gt=0
+    )
+    candidates = (
+        stats.filter(agent_key=key["agent_key"], category_key=key["category_key"]),
+        stats.filter(agent_key=key["agent_key"]),
+        stats,
+    )
+    for _ in range(count):
+        for queryset in candidates:
+            pk = queryset.order_by("pk").values_list("pk", flat=True).first()
+            if pk and stats.filter(pk=pk).update(converted=F("converted") - 1):
+                break
+
+
+def leads_created(leads):
+    """Për bulk_create, që nuk lëshon post_save."""
+    events = defaultdict(Counter)
+    for lead in leads:
+        values = lead.tracked_values()
+        values["date_added"] = lead.date_added
+        for key, counts in lead_events(values).items():
+            events[key].update(counts)
+    record(events)
+
+
+def backfill(organisation=None):
+    """
+    Rindërton rollup-in nga leads ekzistuese me dy GROUP BY (krijime, konvertime).
+    Leads e fshira ose të rikategorizuara pas ngjarjes nuk rikuperohen dot.
+    Kthen numrin e rreshtave të krijuar.
+    """
+    leads = Lead.objects.filter(organisation__isnull=False)
+    if organisation is not None:
+        leads = leads.filter(organisation=organisation)
+    keys = ("organisation_id", "agent_id", "category_id")
+
+    rows = defaultdict(Counter)
+    created = (
+        leads.annotate(day=TruncDate("date_added")).order_by()
+        .values(*keys, "day").annotate(n=Count("id"))
+    )
+    converted = (
+        leads.filter(converted_date__isnull=False)
+        .annotate(day=TruncDate("converted_date")).order_by()
+        .values(*keys, "day").annotate(n=Count("id"))
+    )
+    for field, queryset in (("created", created), ("converted", converted)):
+        for row in queryset:
+            rows[stat_key(row, row["day"])][field] += row["n"]
+
+    with transaction.atomic():
+        stats = LeadDailyStat.objects.all()
+        if organisation is not None:
+            stats = stats.filter(organisation=organisation)
+        stats.delete()
+        LeadDailyStat.objects.bulk_create([
+            LeadDailyStat(
+                organisation_id=organisation_id,
+                agent_key=agent_key,
+                category_key=category_key,
+                day=day,
+                created=counts["created"],
+                converted=counts["converted"],
+            )
+            for (organisation_id, agent_key, category_key, day), counts in rows.items()
+        ], batch_size=1000)
+    return len(rows)
+
+
+def conversion_report(organisation_id, start, end):
+    """
+    Funnel-i (krijuar → konvertuar) dhe trendi ditor për çdo agjent në
+    [start, end], vetëm nga rollup-i.
+    """
+    rows = (
+        LeadDailyStat.objects
+        .filter(organisation_id=organisation_id, day__range=(start, end))
+        .values("agent_key", "day")
+        .annotate(created=Sum("created"), converted=Sum("converted"))
+        .order_by("agent_key", "day")
+    )
+    totals = Counter()
+    per_day = defaultdict(Counter)
+    per_agent = {}
+    for row in rows:
+        totals.update(created=row["created"], converted=row["converted"])
+        per_day[row["day"]].update(created=row["created"], converted=row["converted"])
+        agent = per_agent.setdefault(row["agent_key"], {
+            "agent_id": row["agent_key"] or None,
+            "created": 0,
+            "converted": 0,
+            "series": [],
+        })
+        agent["created"] += row["created"]
+        agent["converted"] += row["converted"]
+        agent["series"].append({
+            "day": row["day"].isoformat(),
+            "created": row["created"],
+            "converted": row["converted"],
+        })
+
+    names = {
+        agent.pk: agent.user.get_full_name() or agent.user.username
+        for agent in Agent.objects.filter(pk__in=per_agent).select_related("user")
+    }
+    for agent in per_agent.values():
+        agent["name"] = names.get(agent["agent_id"], "Pa agjent" if agent["agent_id"] is None else "I fshirë")
+        agent["conversion_rate"] = conversion_rate(agent)
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "funnel": {
+            "created": totals["created"],
+            "converted": totals["converted"],
+            "conversion_rate": conversion_rate(totals),
+        },
+        "series": [
+            {"day": day.isoformat(), "created": counts["created"], "converted": counts["converted"]}
+            for day, counts in sorted(per_day.items())
+        ],
+        "agents": list(per_agent.values()),
+    }
+
+
+def conversion_rate(counts):
+    return round(counts["converted"] / counts["created"], 4) if counts["created"] else None
+
+
+@receiver(post_save, sender=Lead)
+def lead_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    values = instance.tracked_values()
+    values["date_added"] = instance.date_added
+    old_values = None if created else getattr(instance, "_loaded_values", {})
+    record(lead_events(values, old_values))
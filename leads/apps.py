@@ -1,5 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class LeadsConfig(AppConfig):
     name = 'leads'
+
+    def ready(self):
+        # regjistron receiver-at e sinjaleve
+        from . import (  # noqa: F401
+            analytics, autocomplete, conditional, counters, dedup, ingestion, instrumentation, metrics,
+            notifications, stats,
+        )
+        from .search import install_search_index
+
+        post_migrate.connect(install_search_index, sender=self)
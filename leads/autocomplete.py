@@ -0,0 +1,189 @@
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import phones
+from .blocking import fold
+from .models import Lead, LeadSearchTerm
+
+
+MAX_RESULTS = 20
+TERM_FIELDS = ("organisation_id", "first_name", "last_name", "email", "phone_number")
+
+
+def phone_digits(text):
+    return "".join(ch for ch in text or "" if ch.isdigit())
+
+
+def normalize_prefix(prefix):
+    # "069 12" → "06912", që të përputhet me telefonin e ruajtur pa hapësira
+    if prefix and all(ch.isdigit() or ch in " +-()" for ch in prefix):
+        return phone_digits(prefix)
+    return fold(prefix)
+
+
+def terms_for(values):
+    first_name = fold(values["first_name"])
+    last_name = fold(values["last_name"])
+    terms = {
+        first_name,
+        last_name,
+        f"{first_name} {last_name}".strip(),
+        fold(values["email"]),
+        phone_digits(values["phone_number"]),
+        phones.normalize(values["phone_number"]),
+    }
+    return sorted(term[:254] for term in terms if term)
+
+
+def index_leads(leads):
+    """Shton termat e leads të reja (p.sh. pas bulk_create)."""
+    LeadSearchTerm.objects.bulk_create([
+        LeadSearchTerm(organisation_id=lead.organisation_id, lead_id=lead.pk, term=term)
+        for lead in leads
+        if lead.organisation_id is not None
+        for term in terms_for(lead.tracked_values())
+    ], batch_size=1000)
+    invalidate(*{lead.organisation_id for lead in leads})
+
+
+def version_key(organisation_id):
+    return f"autocomplete:version:{organisation_id}"
+
+
+def get_version(organisation_id):
+    """Versioni i të dhënave të organizatës; i përbashkët për të gjithë proceset."""
+    key = version_key(organisation_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def invalidate(*organisation_ids):
+    # ndryshimi i versionit i bën të vjetra hyrjet e LRU-së në çdo proces
+    for organisation_id in organisation_ids:
+        if organisation_id is not None:
+            cache.set(version_key(organisation_id), uuid.uuid4().hex, None)
+
+
+class PrefixCache:
+    """
+    LRU në memorien e procesit: për çdo organizatë, prefiksi → rezultatet.
+    Çdo hyrje mban versionin e organizatës; hyrjet me version të vjetër
+    trajtohen si mungesë. Kur kalohet kufiri nxirret hyrja më pak e përdorur,
+    dhe po ashtu organizata më pak e përdorur.
+    """
+
+    def __init__(self, size=256, organisations=500):
+        self.size = size
+        self.organisations = organisations
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, organisation_id, key, version):
+        with self._lock:
+            entries = self._entries.get(organisation_id)
+            if entries is None or key not in entries:
+                return None
+            self._entries.move_to_end(organisation_id)
+            entries.move_to_end(key)
+            entry_version, results = entries[key]
+            if entry_version != version:
+                del entries[key]
+                return None
+            return results
+
+    def set(self, organisation_id, key, version, results):
+        with self._lock:
+            entries = self._entries.setdefault(organisation_id, OrderedDict())
+            self._entries.move_to_end(organisation_id)
+            entries[key] = (version, results)
+            entries.move_to_end(key)
+            while len(entries) > self.size:
+                entries.popitem(last=False)
+            while len(self._entries) > self.organisations:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+prefix_cache = PrefixCache(size=getattr(settings, "LEAD_AUTOCOMPLETE_CACHE_SIZE", 256))
+
+
+def find_leads(organisation_id, prefix, limit, agent_id=None):
+    """
+    Leads e organizatës që kanë një term që fillon me `prefix`, sipas termit.
+    Range-i [prefix, prefix + U+10FFFF) shërbehet nga indeksi (organisation, term).
+    """
+    terms = LeadSearchTerm.objects.filter(
+        organisation_id=organisation_id,
+        term__gte=prefix,
+        term__lt=prefix + "\U0010ffff",
+    )
+    if agent_id is not None:
+        terms = terms.filter(lead__agent_id=agent_id)
+
+    lead_ids = []
+    # një lead mund të ketë disa terma me të njëjtin prefiks
+    for lead_id in terms.order_by("term").values_list("lead_id", flat=True)[:limit * 5]:
+        if lead_id not in lead_ids:
+            lead_ids.append(lead_id)
+            if len(lead_ids) == limit:
+                break
+
+    leads = Lead.objects.in_bulk(lead_ids)
+    return [
+        {
+            "id": lead.pk,
+            "name": f"{lead.first_name} {lead.last_name}",
+            "email": lead.email,
+            "phone_number": lead.phone_number,
+        }
+        for lead in (leads[pk] for pk in lead_ids if pk in leads)
+    ]
+
+
+def autocomplete(organisation_id, prefix, limit=8, agent_id=None):
+    prefix = normalize_prefix(prefix)
+    limit = max(1, min(limit, MAX_RESULTS))
+    if not prefix:
+        return []
+    version = get_version(organisation_id)
+    key = (agent_id, limit, prefix)
+    results = prefix_cache.get(organisation_id, key, version)
+    if results is None:
+        results = find_leads(organisation_id, prefix, limit, agent_id)
+        prefix_cache.set(organisation_id, key, version, results)
+    return results
+
+
+@receiver(post_save, sender=Lead)
+def lead_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    loaded = getattr(instance, "_loaded_values", {})
+    current = instance.tracked_values()
+    if created or any(loaded.get(field) != current[field] for field in TERM_FIELDS):
+        if not created:
+            LeadSearchTerm.objects.filter(lead=instance).delete()
+        index_leads([instance])
+        invalidate(loaded.get("organisation_id"))
+    elif loaded.get("agent_id") != current["agent_id"]:
+        # rezultatet e agjentëve filtrohen sipas agjentit
+        invalidate(instance.organisation_id)
+
+
+@receiver(post_delete, sender=Lead)
+def lead_deleted(sender, instance, **kwargs):
+    # termat fshihen me CASCADE
+    invalidate(instance.organisation_id)
@@ -0,0 +1,60 @@
+import unicodedata
+
+
+# grupet e Soundex-it; zanoret, h, w dhe y nuk kodohen
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+GMAIL_DOMAINS = {"gmail.com", "googlemail.com"}
+
+
+def fold(text):
+    """Lowercase dhe pa diakritikë: "Arbën Çela" → "arben cela"."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower().strip()
+
+
+def soundex(word):
+    """Soundex klasik (4 karaktere): "Robert" dhe "Rupert" → "r163"."""
+    letters = [ch for ch in fold(word) if "a" <= ch <= "z"]
+    if not letters:
+        return ""
+    first = letters[0]
+    code = first
+    previous = SOUNDEX_CODES.get(first, "")
+    for ch in letters[1:]:
+        digit = SOUNDEX_CODES.get(ch, "")
+        if digit and digit != previous:
+            code += digit
+        if ch not in "hw":
+            # h/w nuk ndajnë dy bashkëtingëllore me të njëjtin kod; zanoret po
+            previous = digit
+        if len(code) == 4:
+            break
+    return code.ljust(4, "0")
+
+
+def name_key(first_name, last_name):
+    first, last = soundex(first_name), soundex(last_name)
+    return f"{first}{last}" if first and last else ""
+
+
+def email_key(email):
+    """
+    Email-i në formën kanonike: lowercase, pa "+etiketë", dhe pa pika
+    në pjesën lokale për Gmail ("A.Hoxha+crm@gmail.com" → "ahoxha@gmail.com").
+    """
+    email = fold(email)
+    local, at, domain = email.partition("@")
+    if not at or not local or not domain:
+        return email
+    local = local.split("+", 1)[0]
+    if domain in GMAIL_DOMAINS:
+        local = local.replace(".", "")
+        domain = "gmail.com"
+    return f"{local}@{domain}"
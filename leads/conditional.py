@@ -0,0 +1,97 @@
+import hashlib
+
+from django.contrib import messages
+from django.db.models import Count, F, Subquery
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from .models import Category, FollowUp, Lead, Notification, User, UserProfile
+
+
+def notification_state(user_id):
+    """
+    Gjendja e njoftimeve të userit si dy subquery mbi indekset (user, created_at)
+    dhe (user, read, created_at): koha e njoftimit më të ri (edhe i bashkuar e
+    rifreskon) dhe sa janë të palexuar. Lexohet nga DB, jo nga cache-i i procesit,
+    ndaj sheh edhe njoftimet e shkruara nga workers/komandat e tjera.
+    """
+    mine = Notification.objects.filter(user_id=user_id).order_by()
+    return {
+        "notifications_latest": Subquery(mine.order_by("-created_at").values("created_at")[:1]),
+        "notifications_unread": Subquery(
+            mine.filter(read=False).values("user_id").annotate(n=Count("id")).values("n")
+        ),
+    }
+
+
+def make_etag(*parts):
+    return hashlib.md5("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def has_pending_messages(request):
+    # një 304 nuk do t'i shfaqte; len() nuk i shënon si të lexuara
+    return len(messages.get_messages(request)) > 0
+
+
+def feed_etag(request):
+    if has_pending_messages(request):
+        return None
+    user_id = request.user.pk
+    state = notification_state(user_id)
+    latest, unread = User.objects.filter(pk=user_id).annotate(**state).values_list(*state).get()
+    return make_etag(
+        user_id,
+        latest,
+        unread,
+        request.GET.get("since", ""),
+        # përgjigjja mban edhe token-in CSRF, që rrotullohet bashkë me sesionin në login
+        request.session.session_key,
+    )
+
+
+def lead_etag(request, pk, **kwargs):
+    """
+    ETag-u i faqes së lead-it me një query të vetëm me pk. Faqja varet edhe nga
+    njoftimet e navbar-it dhe kategoritë e organizatës. Nuk ka Last-Modified:
+    leximi i një njoftimi ndryshon badge-in pa lënë asnjë kohë në DB, ndaj
+    vetëm numri i të palexuarve në ETag e zbulon.
+    """
+    user = request.user
+    # të njëjtat kushte si LeadDetailView.get_queryset, pa lexuar profilin/agjentin
+    if user.is_organisor:
+        leads = Lead.objects.filter(organisation__user=user)
+    else:
+        leads = Lead.objects.filter(agent__user=user, agent__organisation=F("organisation"))
+    state = notification_state(user.pk)
+    row = (
+        leads.filter(pk=pk)
+        .annotate(**state)
+        .values_list("updated_at", "organisation__categories_updated_at", *state)
+        .first()
+    )
+    if row is None or has_pending_messages(request):
+        # 404 ose mesazhe në pritje: përgjigje e plotë
+        return None
+
+    updated_at, categories_updated_at, notifications_latest, unread = row
+    moments = [m for m in (updated_at, categories_updated_at, notifications_latest) if m is not None]
+    return make_etag(user.pk, pk, unread, *(m.isoformat() for m in moments))
+
+
+def touch_leads(*lead_ids):
+    """Për ndryshimet që nuk kalojnë nga Lead.save() (follow-up, update())."""
+    Lead.objects.filter(pk__in=lead_ids).update(updated_at=now())
+
+
+@receiver(post_save, sender=FollowUp)
+@receiver(post_delete, sender=FollowUp)
+def followup_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_leads(instance.lead_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    UserProfile.objects.filter(pk=instance.organisation_id).update(categories_updated_at=now())
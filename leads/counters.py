@@ -0,0 +1,128 @@
+from collections import Counter
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from . import autocomplete, metrics, stats
+from .models import Lead
+
+
+# fusha e Lead-it → modeli që mban `lead_count` për të
+COUNTED_FIELDS = {
+    "organisation_id": "UserProfile",
+    "agent_id": "Agent",
+    "category_id": "Category",
+}
+
+
+def counted_values(values):
+    return {field: values.get(field) for field in COUNTED_FIELDS}
+
+
+def deltas_for(values, delta):
+    """Ndryshimet {(modeli, pk): delta} për një lead me këto vlera."""
+    return Counter({
+        (COUNTED_FIELDS[field], pk): delta
+        for field, pk in values.items()
+        if pk is not None
+    })
+
+
+def apply_deltas(deltas):
+    """
+    Një UPDATE ... SET lead_count = lead_count + n për çdo (model, n).
+    Rreshtat kapen gjithmonë në të njëjtën renditje që dy transaksione
+    paralele të mos bllokojnë njëri-tjetrin.
+    """
+    grouped = {}
+    for (model_name, pk), delta in sorted(deltas.items()):
+        if delta:
+            grouped.setdefault((model_name, delta), []).append(pk)
+    for (model_name, delta), pks in grouped.items():
+        model = global_apps.get_model("leads", model_name)
+        model.objects.filter(pk__in=pks).update(lead_count=F("lead_count") + delta)
+
+
+def leads_created(leads):
+    """Për bulk_create, që nuk lëshon post_save."""
+    deltas = Counter()
+    for lead in leads:
+        deltas.update(deltas_for(counted_values(lead.tracked_values()), 1))
+    apply_deltas(deltas)
+
+
+def update_leads(queryset, **changes):
+    """
+    queryset.update(agent=..., category=...) që mban edhe numëruesit.
+    Rreshtat bllokohen para leximit, që ndryshimet paralele të mos humbin.
+    """
+    changed = {f"{name}_id": getattr(value, "pk", value) for name, value in changes.items()}
+    with transaction.atomic():
+        rows = list(queryset.select_for_update().values("pk", *COUNTED_FIELDS))
+        pks = []
+        deltas = Counter()
+        for row in rows:
+            pks.append(row.pop("pk"))
+            deltas.update(deltas_for(row, -1))
+            deltas.update(deltas_for(counted_values({**row, **changed}), 1))
+        updated = Lead.objects.filter(pk__in=pks).update(**changes, updated_at=now())
+        apply_deltas(deltas)
+    if "agent" in changes:
+        metrics.LEAD_ASSIGNMENTS.inc(updated)
+    organisation_ids = {row["organisation_id"] for row in rows}
+    stats.invalidate_dashboard(*organisation_ids)
+    autocomplete.invalidate(*organisation_ids)
+    return updated
+
+
+def recount(apps=global_apps):
+    """
+    Rillogarit të gjithë numëruesit me një GROUP BY të vetëm mbi leads.
+    Kthen sa rreshta u korrigjuan.
+    """
+    lead_model = apps.get_model("leads", "Lead")
+    totals = Counter()
+    rows = (
+        lead_model.objects.order_by()
+        .values(*COUNTED_FIELDS)
+        .annotate(n=Count("id"))
+    )
+    for row in rows:
+        n = row.pop("n")
+        for key in deltas_for(row, 1):
+            totals[key] += n
+
+    fixed = 0
+    for model_name in COUNTED_FIELDS.values():
+        model = apps.get_model("leads", model_name)
+        stale = []
+        for obj in model.objects.only("pk", "lead_count"):
+            expected = totals[(model_name, obj.pk)]
+            if obj.lead_count != expected:
+                obj.lead_count = expected
+                stale.append(obj)
+        model.objects.bulk_update(stale, ["lead_count"], batch_size=500)
+        fixed += len(stale)
+    return fixed
+
+
+@receiver(post_save, sender=Lead)
+def lead_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        # fixtures: numëruesit rregullohen me `recount_leads`
+        return
+    deltas = deltas_for(counted_values(instance.tracked_values()), 1)
+    if not created:
+        deltas.subtract(deltas_for(counted_values(getattr(instance, "_loaded_values", {})), 1))
+    apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Lead)
+def lead_deleted(sender, instance, **kwargs):
+    # fshirja nga Collector-i është tashmë brenda një transaksioni
+    values = getattr(instance, "_loaded_values", None) or instance.tracked_values()
+    apply_deltas(deltas_for(counted_values(values), -1))
@@ -0,0 +1,165 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import DuplicateCandidate, FollowUp, Lead
+
+
+# Blloqet kërkohen sipas email-it dhe telefonit (indekse (organisation, çelës)).
+# Soundex-i i emrit shton vetëm pikë: vetëm me të, blloqet janë shumë të gjera
+# ("Ardit Hoxha" ka qindra homonime) dhe do jepnin kryesisht alarme false.
+BLOCKING_KEYS = {"email": "email_key", "phone": "phone_digits"}
+SCORED_KEYS = {**BLOCKING_KEYS, "name": "name_key"}
+WEIGHTS = {"email": 0.6, "phone": 0.5, "name": 0.3}
+FLAG_SCORE = 0.5    # email ose telefon i njëjtë
+MERGE_SCORE = 1.0   # email dhe telefon i njëjtë: i njëjti person
+LOOKUP_CHUNK = 500
+
+
+def key_values(lead):
+    return {field: getattr(lead, field) for field in SCORED_KEYS.values()}
+
+
+def score(row, other):
+    """(arsyet, skori) për dy leads, si dict me fushat e çelësave."""
+    reasons = [
+        kind for kind, field in SCORED_KEYS.items()
+        if row[field] and row[field] == other[field]
+    ]
+    return reasons, round(sum(WEIGHTS[kind] for kind in reasons), 2)
+
+
+def find_matches(leads):
+    """
+    [(lead, [(id, arsyet, skori), ...]), ...] për leads e dhëna, nga leads ekzistuese
+    të së njëjtës organizatë. Një query (me IN) për çdo çelës blocking dhe
+    çdo LOOKUP_CHUNK vlera, jo një krahasim me gjithë tabelën.
+    """
+    leads = [lead for lead in leads if lead.organisation_id is not None]
+    organisation_ids = {lead.organisation_id for lead in leads}
+    rows = {}
+    for field in BLOCKING_KEYS.values():
+        values = sorted({getattr(lead, field) for lead in leads if getattr(lead, field)})
+        for start in range(0, len(values), LOOKUP_CHUNK):
+            found = Lead.objects.filter(
+                organisation_id__in=organisation_ids,
+                **{f"{field}__in": values[start:start + LOOKUP_CHUNK]},
+            ).values("id", "organisation_id", *SCORED_KEYS.values())
+            rows.update((row["id"], row) for row in found)
+
+    blocks = defaultdict(list)
+    for row in rows.values():
+        for field in BLOCKING_KEYS.values():
+            if row[field]:
+                blocks[(row["organisation_id"], field, row[field])].append(row)
+
+    matches = []
+    for lead in leads:
+        candidates = {
+            row["id"]: row
+            for field in BLOCKING_KEYS.values()
+            for row in blocks.get((lead.organisation_id, field, getattr(lead, field)), ())
+            if row["id"] != lead.pk
+        }
+        values = key_values(lead)
+        scored = [(pk, *score(values, row)) for pk, row in candidates.items()]
+        matches.append((lead, sorted(scored, key=lambda match: (-match[2], match[0]))))
+    return matches
+
+
+def flag_duplicates(leads):
+    """Ruan si DuplicateCandidate çdo përputhje me një lead më të vjetër."""
+    candidates = [
+        DuplicateCandidate(
+            organisation_id=lead.organisation_id,
+            lead=lead,
+            duplicate_of_id=pk,
+            reasons=",".join(reasons),
+            score=lead_score,
+        )
+        for lead, matches in find_matches(leads)
+        for pk, reasons, lead_score in matches
+        if lead_score >= FLAG_SCORE and pk < lead.pk
+    ]
+    DuplicateCandidate.objects.bulk_create(candidates, ignore_conflicts=True)
+    return candidates
+
+
+def find_existing(leads):
+    """
+    Për çdo lead (edhe të paruajtur) id-ja e lead-it ekzistues që është
+    padyshim i njëjti person, ose None; me një kalim të vetëm mbi blloqet.
+    """
+    for lead in leads:
+        lead.compute_keys()
+    existing = {}
+    for lead, matches in find_matches(leads):
+        # përputhjet janë renditur sipas skorit
+        if matches and matches[0][2] >= MERGE_SCORE:
+            existing[id(lead)] = matches[0][0]
+    return [existing.get(id(lead)) for lead in leads]
+
+
+FILLABLE_FIELDS = ("age", "phone_number", "service", "agent", "category", "profile_picture")
+
+
+def fill_blanks(primary, other):
+    for field in FILLABLE_FIELDS:
+        if not getattr(primary, field) and getattr(other, field):
+            setattr(primary, field, getattr(other, field))
+
+
+def merge(primary, duplicate):
+    """
+    Bashkon `duplicate` te `primary`: plotëson fushat bosh, kalon
+    follow-up-et dhe fshin dublikatën.
+    """
+    with transaction.atomic():
+        fill_blanks(primary, duplicate)
+        primary.save()
+        FollowUp.objects.filter(lead=duplicate).update(lead=primary)
+        duplicate.delete()
+    return primary
+
+
+def candidate_pairs(organisation=None, chunk_size=LOOKUP_CHUNK):
+    """
+    Për komandën `find_duplicate_leads`: për çdo çelës blocking gjen vlerat që
+    përsëriten (GROUP BY ... HAVING), pastaj çdo lead i bllokut krahasohet vetëm
+    me më të vjetrin e bllokut. Kthen çiftet (lead, i_vjetri, arsyet, skori).
+    """
+    leads = Lead.objects.filter(organisation__isnull=False)
+    if organisation is not None:
+        leads = leads.filter(organisation=organisation)
+
+    for field in BLOCKING_KEYS.values():
+        repeated = (
+            leads.exclude(**{field: ""}).order_by()
+            .values("organisation_id", field).annotate(n=Count("id")).filter(n__gt=1)
+            .values_list(field, flat=True)
+        )
+        values = sorted(set(repeated.iterator()))
+        for start in range(0, len(values), chunk_size):
+            rows = (
+                leads.filter(**{f"{field}__in": values[start:start + chunk_size]})
+                .order_by("organisation_id", field, "id")
+                .values("id", "organisation_id", *SCORED_KEYS.values())
+            )
+            oldest = {}
+            for row in rows:
+                block = (row["organisation_id"], row[field])
+                if block not in oldest:
+                    oldest[block] = row
+                    continue
+                anchor = oldest[block]
+                reasons, pair_score = score(row, anchor)
+                yield row["organisation_id"], row["id"], anchor["id"], reasons, pair_score
+
+
+@receiver(post_save, sender=Lead)
+def lead_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        flag_duplicates([instance])
@@ -0,0 +1,50 @@
+from django.db.models import Q
+
+from .phones import is_phone_query, phone_lookup
+from .search import is_text_query, search_leads
+
+
+# Çdo renditje mbyllet me "id" që rendi të jetë unik
+# (pa këtë, navigimi me cursor mund të kapërcejë rreshta me të njëjtën datë)
+SORT_ORDERINGS = {
+    "date_asc": ("date_added", "id"),
+    "date_desc": ("-date_added", "-id"),
+    "first_asc": ("first_name", "id"),
+    "first_desc": ("-first_name", "-id"),
+    # vetëm kur ka kërkim me tekst (search_rank vjen nga search_leads)
+    "relevance": ("-search_rank", "-id"),
+}
+DEFAULT_SORT = "date_desc"
+
+
+def get_ordering(params):
+    sort = params.get("sort")
+    if sort == "relevance" and not is_text_query(params.get("q")):
+        sort = DEFAULT_SORT
+    return SORT_ORDERINGS.get(sort, SORT_ORDERINGS[DEFAULT_SORT])
+
+
+def filter_leads(queryset, params):
+    """
+    Zbaton filtrat e listës së leads (q, agent, category) mbi queryset-in.
+    `params` është request.GET ose querystring-u i ruajtur në sesion.
+    """
+    q = params.get("q")
+    agent = params.get("agent")
+    category = params.get("category")
+
+    if q:
+        if is_phone_query(q):
+            condition = phone_lookup(q)      # numri i normalizuar ose prapashtesa
+            if q.isdigit():
+                condition |= Q(id=int(q))    # vetëm ID exakte
+            queryset = queryset.filter(condition)
+        else:
+            queryset = search_leads(queryset, q)
+
+    if agent:
+        queryset = queryset.filter(agent__id=agent)
+    if category:
+        queryset = queryset.filter(category__id=category)
+
+    return queryset
@@ -1,7 +1,9 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import UserCreationForm, UsernameField
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm, UsernameField
+from django.template import loader
+from .mail import queue_mail
 from .models import Lead, Agent, Category, FollowUp
 
 User = get_user_model()
@@ -51,12 +53,26 @@ class CustomUserCreationForm(UserCreationForm):
         fields = ("username", "first_name", "last_name", "email", "password1", "password2")
         field_classes = {"username": UsernameField}
 
+class OutboxPasswordResetForm(PasswordResetForm):
+    """Email-i i resetimit shkon në outbox në vend që të dërgohet gjatë request-it."""
+
+    def send_mail(self, subject_template_name, email_template_name, context,
+                  from_email, to_email, html_email_template_name=None):
+        subject = loader.render_to_string(subject_template_name, context)
+        subject = "".join(subject.splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_body = ""
+        if html_email_template_name is not None:
+            html_body = loader.render_to_string(html_email_template_name, context)
+        queue_mail(subject, body, [to_email], from_email=from_email, html_message=html_body)
+
+
 class AssignAgentForm(forms.Form):
     agent = forms.ModelChoiceField(queryset=Agent.objects.none())
 
     def __init__(self, *args, **kwargs):
         request = kwargs.pop("request")
-        agents = Agent.objects.filter(organisation=request.user.userprofile)
+        agents = Agent.objects.for_user(request.user)
         super(AssignAgentForm, self).__init__(*args, **kwargs)
         self.fields["agent"].queryset = agents
 
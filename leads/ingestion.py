@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from . import dedup, metrics, notifications
+from .importing import bulk_insert_leads
+from .models import Agent, Category, FollowUp, Lead, LeadSubmission, User
+
+TARGET_CACHE_KEY = "public_form:target"
+TARGET_TIMEOUT = 60 * 60
+
+
+def enqueue_submission(data):
+    """Ruajtja e vetme që bën forma publike: një INSERT, pa sinjale."""
+    return LeadSubmission.objects.create(payload=data)
+
+
+def public_form_target():
+    """
+    Organizata, agjenti dhe kategoria "New" ku shkojnë leads e formës publike,
+    si id-ja nga cache; në mungesë zgjidhen (dhe krijohen) një herë.
+    """
+    target = cache.get(TARGET_CACHE_KEY)
+    if target is None:
+        admin_user = User.objects.get(username=getattr(settings, "PUBLIC_LEAD_ORGANISOR", "admin"))
+        organisation = admin_user.userprofile
+        agent, _ = Agent.objects.get_or_create(user=admin_user, organisation=organisation)
+        category, _ = Category.objects.get_or_create(name="New", organisation=organisation)
+        target = {
+            "user_id": admin_user.pk,
+            "organisation_id": organisation.pk,
+            "agent_id": agent.pk,
+            "category_id": category.pk,
+        }
+        cache.set(TARGET_CACHE_KEY, target, TARGET_TIMEOUT)
+    return target
+
+
+def process_submissions(batch_size=500):
+    """
+    Kthen një batch kërkesash në leads brenda një transaksioni: kërkesat e
+    të njëjtit person (në batch ose me një lead ekzistues) bashkohen, të tjerat
+    futen me bulk_insert_leads. Kthen (krijuar, bashkuar).
+    """
+    with transaction.atomic(), notifications.batch():
+        batch = list(
+            LeadSubmission.objects.select_for_update(skip_locked=True).order_by("id")[:batch_size]
+        )
+        if not batch:
+            return 0, 0
+        target = public_form_target()
+
+        leads = [
+            Lead(
+                **submission.payload,
+                organisation_id=target["organisation_id"],
+                agent_id=target["agent_id"],
+                category_id=target["category_id"],
+            )
+            for submission in batch
+        ]
+        new_leads = {}
+        merged_into = {}  # id e lead-it ekzistues → lead-i i përditësuar
+        followups = []
+        for lead, existing_id in zip(leads, dedup.find_existing(leads)):
+            if existing_id is not None:
+                existing = merged_into.get(existing_id) or Lead.objects.get(pk=existing_id)
+                dedup.fill_blanks(existing, lead)
+                merged_into[existing_id] = existing
+                followups.append(FollowUp(
+                    lead_id=existing_id,
+                    agent_id=target["user_id"],
+                    notes=repeated_request_note(lead),
+                ))
+                continue
+            key = (lead.email_key, lead.phone_digits)
+            if all(key) and key in new_leads:
+                # i njëjti person dy herë në të njëjtin batch
+                dedup.fill_blanks(new_leads[key], lead)
+                continue
+            new_leads[key if all(key) else id(lead)] = lead
+
+        for existing in merged_into.values():
+            existing.save()
+        created = bulk_insert_leads(list(new_leads.values()), source="public_form")
+        FollowUp.objects.bulk_create(followups)
+        metrics.FOLLOWUPS_CREATED.inc(len(followups))
+        LeadSubmission.objects.filter(pk__in=[submission.pk for submission in batch]).delete()
+
+        # bulk_create nuk lëshon post_save (notify_new_lead)
+        notifications.notify_new_leads(target["user_id"], created)
+    return len(created), len(batch) - len(created)
+
+
+def repeated_request_note(lead):
+    note = "Kërkesë e përsëritur nga forma publike"
+    return f"{note}: {lead.service}" if lead.service else note
+
+
+@receiver(post_delete, sender=Agent)
+@receiver(post_delete, sender=Category)
+def target_deleted(sender, instance, **kwargs):
+    # id-të në cache mund të mos ekzistojnë më
+    cache.delete(TARGET_CACHE_KEY)
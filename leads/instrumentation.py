@@ -0,0 +1,116 @@
+import contextvars
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import metrics
+
+
+logger = logging.getLogger(__name__)
+
+# statistikat e kërkesës aktuale; contextvar-i kalon edhe te sync_to_async,
+# ndaj numërohen edhe query-t e view-ve async
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "started")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.started = time.perf_counter()
+
+
+def count_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs):
+    # çdo lidhje e re (një për thread) merr wrapper-in një herë
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def query_budget(view_name):
+    budgets = getattr(settings, "QUERY_BUDGETS", {})
+    return budgets.get(view_name, getattr(settings, "QUERY_BUDGET_DEFAULT", None))
+
+
+class QueryBudgetMiddleware:
+    """
+    Për çdo kërkesë: numri i query-ve, koha në DB, koha totale dhe madhësia e
+    përgjigjes, në header-in Server-Timing dhe në një rresht log-u. Kërkesat që
+    kalojnë QUERY_BUDGETS[view] (ose QUERY_BUDGET_DEFAULT) logohen si WARNING.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats)
+
+    def finish(self, request, response, stats):
+        total = time.perf_counter() - stats.started
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        size = None if response.streaming else len(response.content)
+        metrics.observe_request(view_name, total, stats.queries)
+
+        if getattr(settings, "SERVER_TIMING", True):
+            response["Server-Timing"] = (
+                f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+                f"total;dur={total * 1000:.1f}"
+            )
+
+        fields = {
+            "view": view_name,
+            "method": request.method,
+            "status": response.status_code,
+            "queries": stats.queries,
+            "db_ms": round(stats.db_time * 1000, 1),
+            "total_ms": round(total * 1000, 1),
+            "bytes": size,
+        }
+        line = " ".join(f"{key}={value}" for key, value in fields.items())
+        budget = query_budget(view_name)
+        if budget is not None and stats.queries > budget:
+            logger.warning("query budget exceeded (%s) %s", budget, line, extra={"request_stats": fields})
+        else:
+            logger.info("request %s", line, extra={"request_stats": fields})
+        return response
@@ -0,0 +1,108 @@
+import datetime
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = 60  # sekonda; dyfishohet pas çdo dështimi
+CLAIM_TIMEOUT = 300  # sa kohë i "rezervon" një worker email-et që po dërgon
+
+
+def queue_mail(subject, message, recipient_list, from_email=None, html_message=""):
+    """Si send_mail(), por vetëm e shton email-in në outbox (një INSERT)."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or "",
+        from_email=from_email or "",
+        to=list(recipient_list),
+    )
+
+
+def claim_batch(batch_size):
+    """
+    Merr email-et që duhen dërguar tani dhe i shtyn përkohësisht në të ardhmen,
+    që një worker tjetër të mos i marrë njëkohësisht.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutgoingEmail.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        OutgoingEmail.objects.filter(id__in=[email.id for email in batch]).update(
+            next_attempt_at=now + datetime.timedelta(seconds=CLAIM_TIMEOUT)
+        )
+    return batch
+
+
+def record_failure(email, exc):
+    """Një provë e dështuar: backoff eksponencial, FAILED pas MAX_ATTEMPTS."""
+    email.attempts += 1
+    email.last_error = str(exc)
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = OutgoingEmail.FAILED
+    email.next_attempt_at = timezone.now() + datetime.timedelta(
+        seconds=RETRY_BACKOFF * 2 ** (email.attempts - 1)
+    )
+
+
+def deliver_queued_mail(batch_size=50):
+    """
+    Dërgon një batch nga outbox-i me një lidhje të vetme SMTP.
+    Dështimet riprovohen me backoff eksponencial deri në MAX_ATTEMPTS.
+    Kthen (të dërguara, të dështuara).
+    """
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    sent = failed = 0
+    backend = getattr(settings, "OUTBOX_EMAIL_BACKEND", None)
+    connection = get_connection(backend=backend)
+    try:
+        connection.open()
+    except Exception as exc:
+        # host/auth/TLS i gabuar: i gjithë batch-i numërohet si provë e dështuar,
+        # përndryshe email-et do të mbeteshin të rezervuar pa backoff e pa FAILED
+        logger.warning("Lidhja për email-et dështoi: %s", exc)
+        for email in batch:
+            record_failure(email, exc)
+        failed = len(batch)
+    else:
+        try:
+            for email in batch:
+                message = EmailMultiAlternatives(
+                    email.subject, email.body, email.from_email or None, email.to,
+                    connection=connection,
+                )
+                if email.html_body:
+                    message.attach_alternative(email.html_body, "text/html")
+                try:
+                    connection.send_messages([message])
+                except Exception as exc:
+                    record_failure(email, exc)
+                    logger.warning("Email %s dështoi (prova %s): %s", email.pk, email.attempts, exc)
+                    failed += 1
+                else:
+                    email.attempts += 1
+                    email.status = OutgoingEmail.SENT
+                    email.sent_at = timezone.now()
+                    email.last_error = ""
+                    sent += 1
+        finally:
+            connection.close()
+
+    OutgoingEmail.objects.bulk_update(
+        batch, ["status", "attempts", "next_attempt_at", "last_error", "sent_at"]
+    )
+    return sent, failed
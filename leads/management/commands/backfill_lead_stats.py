@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from leads.analytics import backfill
+from leads.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = "Rindërton rollup-in ditor LeadDailyStat nga leads ekzistuese."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organisor-email', type=str, help="vetëm për këtë organizatë")
+
+    def handle(self, *args, **options):
+        organisation = None
+        if options['organisor_email']:
+            organisation = UserProfile.objects.get(user__email=options['organisor_email'])
+        rows = backfill(organisation)
+        self.stdout.write(self.style.SUCCESS(f"U shkruan {rows} rreshta statistikash."))
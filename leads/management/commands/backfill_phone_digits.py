@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from leads.models import Lead
+
+
+class Command(BaseCommand):
+    help = "Plotëson phone_digits/phone_digits_rev për leads ekzistuese, me batch sipas id."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        updated = 0
+        while True:
+            leads = list(
+                Lead.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", "phone_number", "phone_digits", "phone_digits_rev")[:batch_size]
+            )
+            if not leads:
+                break
+            last_id = leads[-1].id
+            changed = []
+            for lead in leads:
+                digits = (lead.phone_digits, lead.phone_digits_rev)
+                lead.normalize_phone()
+                if (lead.phone_digits, lead.phone_digits_rev) != digits:
+                    changed.append(lead)
+            # bulk_update nuk kalon nga save(), ndaj sinjalet nuk lëshohen
+            Lead.objects.bulk_update(changed, ["phone_digits", "phone_digits_rev"])
+            updated += len(changed)
+            self.stdout.write(f"... deri te id {last_id}: {updated} u përditësuan")
+
+        self.stdout.write(self.style.SUCCESS(f"U normalizuan {updated} numra telefoni."))
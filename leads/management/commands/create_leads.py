@@ -1,31 +1,39 @@
-from django.core.management.base import BaseCommand
 from csv import DictReader
-from leads.models import Lead, UserProfile
+
+from django.core.management.base import BaseCommand
+
+from leads.importing import LeadImporter
+from leads.models import UserProfile
+
 
 class Command(BaseCommand):
+    help = "Importon leads nga një CSV (first_name, last_name, age, email, phone_number)."
 
     def add_arguments(self, parser):
         parser.add_argument('file_name', type=str)
         parser.add_argument('organisor_email', type=str)
+        parser.add_argument('--batch-size', type=int, default=1000)
 
     def handle(self, *args, **options):
         file_name = options['file_name']
         organisor_email = options['organisor_email']
 
         organisation = UserProfile.objects.get(user__email=organisor_email)
+        importer = LeadImporter(
+            organisation,
+            batch_size=options['batch_size'],
+            progress=self.report_progress,
+        )
+
+        with open(file_name, 'r', newline='', encoding='utf-8') as read_obj:
+            result = importer.run(DictReader(read_obj))
+
+        for line, message in result.errors:
+            self.stderr.write(f"Rreshti {line}: {message}")
+        self.stdout.write(self.style.SUCCESS(
+            f"U importuan {result.created} leads në {result.elapsed:.1f}s "
+            f"({result.rate:.0f}/s), {len(result.errors)} rreshta u refuzuan."
+        ))
 
-        with open(file_name, 'r') as read_obj:
-            csv_reader = DictReader(read_obj)
-            for row in csv_reader:
-                first_name = row['first_name']
-                last_name = row['last_name']
-                age = row['age']
-                email = row['email']
-
-                Lead.objects.create(
-                    organisation=organisation,
-                    first_name=first_name,
-                    last_name=last_name,
-                    age=age,
-                    email=email,
-                )
\ No newline at end of file
+    def report_progress(self, result):
+        self.stdout.write(f"... {result.created} leads ({result.rate:.0f}/s)")
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+
+from leads.dedup import FLAG_SCORE, candidate_pairs
+from leads.models import DuplicateCandidate, Lead, UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Gjen leads të dublikuara me çelësa blocking (email, telefon) dhe i ruan "
+        "si DuplicateCandidate, pa krahasuar çdo lead me çdo lead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organisor-email', type=str, help="vetëm për këtë organizatë")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--refresh-keys', action='store_true',
+                            help="rillogarit çelësat për të gjitha leads para kërkimit")
+
+    def handle(self, *args, **options):
+        organisation = None
+        if options['organisor_email']:
+            organisation = UserProfile.objects.get(user__email=options['organisor_email'])
+        chunk_size = options['chunk_size']
+
+        refreshed = self.refresh_keys(organisation, chunk_size, options['refresh_keys'])
+        if refreshed:
+            self.stdout.write(f"U rillogaritën çelësat për {refreshed} leads.")
+
+        found = 0
+        batch = []
+        for organisation_id, lead_id, duplicate_of_id, reasons, score in candidate_pairs(organisation, chunk_size):
+            if score < FLAG_SCORE:
+                continue
+            batch.append(DuplicateCandidate(
+                organisation_id=organisation_id,
+                lead_id=lead_id,
+                duplicate_of_id=duplicate_of_id,
+                reasons=",".join(reasons),
+                score=score,
+            ))
+            if len(batch) >= chunk_size:
+                found += self.save(batch)
+                batch = []
+        found += self.save(batch)
+        self.stdout.write(self.style.SUCCESS(f"U gjetën {found} çifte të mundshme dublikatash."))
+
+    def save(self, batch):
+        DuplicateCandidate.objects.bulk_create(batch, ignore_conflicts=True)
+        return len(batch)
+
+    def refresh_keys(self, organisation, chunk_size, everything):
+        """Plotëson çelësat (sipas id, në batch) për leads që s'i kanë ende."""
+        leads = Lead.objects.all()
+        if organisation is not None:
+            leads = leads.filter(organisation=organisation)
+        if not everything:
+            leads = leads.filter(email_key="").exclude(email="")
+
+        refreshed = 0
+        last_id = 0
+        while True:
+            chunk = list(leads.filter(id__gt=last_id).order_by("id")[:chunk_size])
+            if not chunk:
+                return refreshed
+            last_id = chunk[-1].id
+            for lead in chunk:
+                lead.compute_keys()
+            Lead.objects.bulk_update(
+                chunk, ["phone_digits", "phone_digits_rev", "email_key", "name_key"]
+            )
+            refreshed += len(chunk)
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from leads.ingestion import process_submissions
+
+
+class Command(BaseCommand):
+    help = "Kthen kërkesat e formës publike (LeadSubmission) në leads, me batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--loop', action='store_true', help="Mos dil; kontrollo radhën vazhdimisht.")
+        parser.add_argument('--interval', type=float, default=2, help="Sekonda pritje kur radha është bosh.")
+
+    def handle(self, *args, **options):
+        while True:
+            created, merged = process_submissions(options['batch_size'])
+            if created or merged:
+                self.stdout.write(f"U krijuan {created} leads, {merged} kërkesa u bashkuan.")
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,29 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from leads.notifications import prune_read
+
+
+class Command(BaseCommand):
+    help = "Fshin (ose arkivon) njoftimet e lexuara më të vjetra se --days, me batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 30),
+            help="Mosha minimale e njoftimeve të lexuara që hiqen.",
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--archive', action='store_true', help="Kopjo te NotificationArchive para fshirjes.")
+        parser.add_argument('--pause', type=float, default=0, help="Sekonda pritje mes batch-eve.")
+
+    def handle(self, *args, **options):
+        removed = prune_read(
+            datetime.timedelta(days=options['days']),
+            batch_size=options['batch_size'],
+            archive=options['archive'],
+            pause=options['pause'],
+        )
+        action = "u arkivuan" if options['archive'] else "u fshinë"
+        self.stdout.write(f"{removed} njoftime të lexuara {action}.")
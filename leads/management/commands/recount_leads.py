@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from leads.counters import recount
+
+
+class Command(BaseCommand):
+    help = "Rillogarit lead_count për organizatat, agjentët dhe kategoritë me një GROUP BY."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = recount()
+        self.stdout.write(self.style.SUCCESS(f"U korrigjuan {fixed} numërues."))
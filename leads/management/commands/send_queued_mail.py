@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from leads.mail import deliver_queued_mail
+
+
+class Command(BaseCommand):
+    help = "Dërgon email-et nga outbox-i (OutgoingEmail) me një lidhje SMTP për batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--loop', action='store_true', help="Mos dil; kontrollo outbox-in vazhdimisht.")
+        parser.add_argument('--interval', type=float, default=5, help="Sekonda pritje kur outbox-i është bosh.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_queued_mail(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f"U dërguan {sent} email-e, {failed} dështuan.")
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
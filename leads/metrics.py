@@ -0,0 +1,136 @@
+"""
+Metrikat e CRM-së në formatin e Prometheus-it (`/metrics`).
+
+Numëruesit dhe histogramet mbahen në memorien e procesit nga prometheus_client.
+Me disa workers (gunicorn/uvicorn) vendos PROMETHEUS_MULTIPROC_DIR në një direktori
+bosh para nisjes: çdo proces shkruan vlerat në skedarët e vet (mmap) dhe `/metrics`
+i mbledh të gjitha, pavarësisht se cili worker e merr kërkesën. Gjendja e radhëve
+(submissions, email-e, njoftime të palexuara) lexohet nga DB në kohën e scrape-it.
+"""
+import ipaddress
+import os
+
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from .models import FollowUp, Lead, LeadSubmission, Notification, OutgoingEmail
+from .ratelimit import get_counts
+
+
+LEADS_CREATED = Counter(
+    "crm_leads_created_total", "Leads të krijuara, sipas burimit.", ["source"],
+)
+LEAD_ASSIGNMENTS = Counter(
+    "crm_lead_assignments_total", "Ndryshime të agjentit të një lead-i ekzistues.",
+)
+FOLLOWUPS_CREATED = Counter(
+    "crm_followups_created_total", "Follow-up të krijuara.",
+)
+NOTIFICATIONS_CREATED = Counter(
+    "crm_notifications_created_total", "Njoftime të krijuara (fan-out te userat).",
+)
+REQUEST_DURATION = Histogram(
+    "crm_request_duration_seconds", "Koha e kërkesave sipas view-t.", ["view"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    "crm_request_queries", "Query SQL për kërkesë, sipas view-t.", ["view"],
+    buckets=(1, 2, 5, 10, 15, 20, 30, 50, 100),
+)
+
+
+def leads_created(source, count=1):
+    if count:
+        LEADS_CREATED.labels(source=source).inc(count)
+
+
+def observe_request(view_name, duration, queries):
+    view = view_name or "unresolved"
+    REQUEST_DURATION.labels(view=view).observe(duration)
+    REQUEST_QUERIES.labels(view=view).observe(queries)
+
+
+class BacklogCollector:
+    """Gjendja aktuale e radhëve, nga DB, në çdo scrape."""
+
+    def collect(self):
+        yield GaugeMetricFamily(
+            "crm_lead_submissions_pending", "Kërkesa të formës publike që presin worker-in.",
+            value=LeadSubmission.objects.count(),
+        )
+        yield GaugeMetricFamily(
+            "crm_outgoing_emails_pending", "Email-e në outbox që s'janë dërguar ende.",
+            value=OutgoingEmail.objects.filter(status=OutgoingEmail.PENDING).count(),
+        )
+        yield GaugeMetricFamily(
+            "crm_notifications_unread", "Njoftime të palexuara (të gjithë userat).",
+            # indeksi i pjesshëm notif_unread_user_idx: pa skanuar njoftimet e lexuara
+            value=Notification.objects.filter(read=False).count(),
+        )
+        requests = CounterMetricFamily(
+            "crm_public_form_requests", "POST-e te forma publike, sipas rate limiter-it.",
+            labels=["outcome"],
+        )
+        for outcome, count in get_counts("public-lead").items():
+            requests.add_metric([outcome], count)
+        yield requests
+
+
+backlog_registry = CollectorRegistry(auto_describe=False)
+backlog_registry.register(BacklogCollector())
+
+
+def render():
+    """Teksti i plotë për `/metrics`."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry) + generate_latest(backlog_registry)
+
+
+def authorized(request):
+    """Me token: vetëm Bearer-i i saktë. Pa token: vetëm DEBUG ose adresat e lejuara."""
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token:
+        return constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}")
+    return settings.DEBUG or is_allowed_address(request.META.get("REMOTE_ADDR", ""))
+
+
+def is_allowed_address(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in getattr(settings, "METRICS_ALLOWED_IPS", [])
+    )
+
+
+@receiver(post_save, sender=Lead)
+def lead_saved(sender, instance, created, raw, **kwargs):
+    # bulk_create (importi, forma publike) numërohet te bulk_insert_leads
+    if raw:
+        return
+    if created:
+        leads_created("ui")
+    elif instance.agent_id != getattr(instance, "_loaded_values", {}).get("agent_id", instance.agent_id):
+        LEAD_ASSIGNMENTS.inc()
+
+
+@receiver(post_save, sender=FollowUp)
+def followup_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        FOLLOWUPS_CREATED.inc()
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        NOTIFICATIONS_CREATED.inc()
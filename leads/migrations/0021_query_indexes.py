@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 05:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0020_drop_public_id"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="followup",
+            index=models.Index(fields=["lead", "date_added"], name="followup_lead_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(fields=["organisation", "date_added", "id"], name="lead_org_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(fields=["organisation", "agent", "date_added", "id"], name="lead_org_agent_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(fields=["organisation", "category", "date_added", "id"], name="lead_org_cat_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(fields=["organisation", "first_name", "id"], name="lead_org_first_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(fields=["organisation", "category", "converted_date"], name="lead_org_cat_converted_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(fields=["user", "read", "created_at"], name="notif_user_read_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(fields=["user", "created_at"], name="notif_user_created_idx"),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 05:46
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_lead_counts(apps, schema_editor):
+    # i pavarur nga leads.counters, që migrimi të japë të njëjtin rezultat edhe kur kodi ndryshon
+    Lead = apps.get_model("leads", "Lead")
+    for field, model_name in (("organisation", "UserProfile"), ("agent", "Agent"), ("category", "Category")):
+        counts = (
+            Lead.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(n=Count("id"))
+            .values("n")
+        )
+        apps.get_model("leads", model_name).objects.update(lead_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0022_outgoingemail"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="agent",
+            name="lead_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="lead_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="lead_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_lead_counts, migrations.RunPython.noop),
+    ]
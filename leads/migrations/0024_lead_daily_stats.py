@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 05:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0023_lead_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeadDailyStat",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("agent_key", models.PositiveIntegerField(default=0)),
+                ("category_key", models.PositiveIntegerField(default=0)),
+                ("day", models.DateField()),
+                ("created", models.PositiveIntegerField(default=0)),
+                ("converted", models.PositiveIntegerField(default=0)),
+                ("organisation", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="leads.userprofile")),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("organisation", "day", "agent_key", "category_key"), name="lead_daily_stat_key")],
+            },
+        ),
+    ]
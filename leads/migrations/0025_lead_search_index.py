@@ -0,0 +1,73 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:02
+
+from django.db import migrations
+
+
+# DDL-ja e kohës së këtij migrimi, e ngrirë këtu; leads.search e rikrijon
+# (sipas LEAD_SEARCH_BACKEND aktual) pas çdo `migrate` nëse mungon
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS leads_lead_fts USING fts5("
+    "first_name, last_name, email, content='leads_lead', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    """CREATE TRIGGER IF NOT EXISTS leads_lead_fts_ai AFTER INSERT ON leads_lead BEGIN
+        INSERT INTO leads_lead_fts(rowid, first_name, last_name, email)
+        VALUES (new.id, new.first_name, new.last_name, new.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS leads_lead_fts_ad AFTER DELETE ON leads_lead BEGIN
+        INSERT INTO leads_lead_fts(leads_lead_fts, rowid, first_name, last_name, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS leads_lead_fts_au AFTER UPDATE OF first_name, last_name, email ON leads_lead BEGIN
+        INSERT INTO leads_lead_fts(leads_lead_fts, rowid, first_name, last_name, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+        INSERT INTO leads_lead_fts(rowid, first_name, last_name, email)
+        VALUES (new.id, new.first_name, new.last_name, new.email);
+    END""",
+    "INSERT INTO leads_lead_fts(leads_lead_fts) VALUES ('rebuild')",
+]
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS leads_lead_fts_ai",
+    "DROP TRIGGER IF EXISTS leads_lead_fts_ad",
+    "DROP TRIGGER IF EXISTS leads_lead_fts_au",
+    "DROP TABLE IF EXISTS leads_lead_fts",
+]
+POSTGRES_INSTALL = [
+    "CREATE INDEX IF NOT EXISTS lead_search_vector_idx ON leads_lead USING GIN ("
+    "to_tsvector('simple', coalesce(first_name, '') || ' ' || "
+    "coalesce(last_name, '') || ' ' || translate(coalesce(email, ''), '@.', '  ')))",
+]
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS lead_search_vector_idx",
+]
+
+STATEMENTS = {
+    "sqlite": (SQLITE_INSTALL, SQLITE_UNINSTALL),
+    "postgresql": (POSTGRES_INSTALL, POSTGRES_UNINSTALL),
+}
+
+
+def run(schema_editor, index):
+    # DB-të e tjera përdorin icontains, pa indeks
+    statements = STATEMENTS.get(schema_editor.connection.vendor, ([], []))[index]
+    for sql in statements:
+        schema_editor.execute(sql, params=None)
+
+
+def install(apps, schema_editor):
+    run(schema_editor, 0)
+
+
+def uninstall(apps, schema_editor):
+    run(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0024_lead_daily_stats"),
+    ]
+
+    operations = [
+        # FTS5 + trigger-a në SQLite, indeks GIN mbi tsvector në Postgres
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.5 on 2026-10-18 05:57
+
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# termat siç ndërtoheshin kur u shkrua migrimi, pa importuar leads.autocomplete
+def fold(text):
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower().strip()
+
+
+def terms_for(values):
+    first_name = fold(values["first_name"])
+    last_name = fold(values["last_name"])
+    terms = {
+        first_name,
+        last_name,
+        f"{first_name} {last_name}".strip(),
+        fold(values["email"]),
+        "".join(ch for ch in values["phone_number"] or "" if ch.isdigit()),
+    }
+    return sorted(term[:254] for term in terms if term)
+
+
+def fill_search_terms(apps, schema_editor):
+    Lead = apps.get_model("leads", "Lead")
+    LeadSearchTerm = apps.get_model("leads", "LeadSearchTerm")
+    leads = Lead.objects.filter(organisation__isnull=False).values(
+        "id", "organisation_id", "first_name", "last_name", "email", "phone_number"
+    )
+    batch = []
+    for lead in leads.iterator(chunk_size=2000):
+        batch.extend(
+            LeadSearchTerm(organisation_id=lead["organisation_id"], lead_id=lead["id"], term=term)
+            for term in terms_for(lead)
+        )
+        if len(batch) >= 2000:
+            LeadSearchTerm.objects.bulk_create(batch)
+            batch = []
+    LeadSearchTerm.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0025_lead_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeadSearchTerm",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("term", models.CharField(max_length=254)),
+                ("lead", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="search_terms", to="leads.lead")),
+                ("organisation", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="leads.userprofile")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["organisation", "term"], name="lead_search_term_idx")],
+            },
+        ),
+        migrations.RunPython(fill_search_terms, migrations.RunPython.noop),
+    ]
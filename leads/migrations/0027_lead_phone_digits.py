@@ -0,0 +1,68 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# kopje e ngrirë e leads.phones.normalize, që migrimi të mos varet nga kodi i app-it
+def normalize(raw, country_code):
+    raw = (raw or "").strip()
+    digits = "".join(ch for ch in raw if ch.isdigit())
+    if not digits:
+        return ""
+    if raw.startswith("+"):
+        return digits
+    if digits.startswith("00"):
+        return digits[2:]
+    if digits.startswith("0"):
+        return country_code + digits[1:]
+    if len(digits) <= 9:
+        return country_code + digits
+    return digits
+
+
+def fill_phone_digits(apps, schema_editor, batch_size=2000):
+    # pa këtë, kërkimi me telefon (vetëm mbi phone_digits) s'gjen asnjë lead ekzistues
+    Lead = apps.get_model("leads", "Lead")
+    country_code = getattr(settings, "PHONE_DEFAULT_COUNTRY_CODE", "355")
+    last_id = 0
+    while True:
+        leads = list(
+            Lead.objects.filter(id__gt=last_id).order_by("id").only("id", "phone_number")[:batch_size]
+        )
+        if not leads:
+            return
+        last_id = leads[-1].id
+        for lead in leads:
+            lead.phone_digits = normalize(lead.phone_number, country_code)
+            lead.phone_digits_rev = lead.phone_digits[::-1]
+        Lead.objects.bulk_update(leads, ["phone_digits", "phone_digits_rev"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0026_lead_search_terms"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lead",
+            name="phone_digits",
+            field=models.CharField(blank=True, default="", editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name="lead",
+            name="phone_digits_rev",
+            field=models.CharField(blank=True, default="", editable=False, max_length=20),
+        ),
+        migrations.RunPython(fill_phone_digits, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(fields=["organisation", "phone_digits"], name="lead_org_phone_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(fields=["organisation", "phone_digits_rev"], name="lead_org_phone_rev_idx"),
+        ),
+    ]
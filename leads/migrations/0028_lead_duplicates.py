@@ -0,0 +1,61 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0027_lead_phone_digits"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DuplicateCandidate",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("reasons", models.CharField(max_length=50)),
+                ("score", models.FloatField()),
+                ("dismissed", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="lead",
+            name="email_key",
+            field=models.CharField(blank=True, default="", editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name="lead",
+            name="name_key",
+            field=models.CharField(blank=True, default="", editable=False, max_length=8),
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(fields=["organisation", "email_key"], name="lead_org_email_key_idx"),
+        ),
+        migrations.AddField(
+            model_name="duplicatecandidate",
+            name="duplicate_of",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to="leads.lead"),
+        ),
+        migrations.AddField(
+            model_name="duplicatecandidate",
+            name="lead",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="duplicate_candidates", to="leads.lead"),
+        ),
+        migrations.AddField(
+            model_name="duplicatecandidate",
+            name="organisation",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="leads.userprofile"),
+        ),
+        migrations.AddIndex(
+            model_name="duplicatecandidate",
+            index=models.Index(fields=["organisation", "dismissed", "created_at"], name="duplicate_org_open_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="duplicatecandidate",
+            constraint=models.UniqueConstraint(fields=("lead", "duplicate_of"), name="duplicate_candidate_pair"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0029_lead_submission"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="count",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="kind",
+            field=models.CharField(blank=True, max_length=30),
+        ),
+    ]
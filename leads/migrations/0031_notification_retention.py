@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0030_notification_kind_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationArchive",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("message", models.TextField()),
+                ("url", models.CharField(blank=True, max_length=200)),
+                ("kind", models.CharField(blank=True, max_length=30)),
+                ("count", models.PositiveIntegerField(default=1)),
+                ("created_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(condition=models.Q(("read", True)), fields=["created_at"], name="notif_read_created_idx"),
+        ),
+        migrations.AddField(
+            model_name="notificationarchive",
+            name="user",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="archived_notifications", to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:34
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_date_added(apps, schema_editor):
+    Lead = apps.get_model("leads", "Lead")
+    Lead.objects.update(updated_at=F("date_added"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0031_notification_retention"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lead",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_date_added, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0032_lead_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="categories_updated_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
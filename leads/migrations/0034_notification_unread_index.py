@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0033_userprofile_categories_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(condition=models.Q(("read", False)), fields=["user"], name="notif_unread_user_idx"),
+        ),
+    ]
@@ -1,11 +1,15 @@
-from django.db import models
+from django.db import models, transaction
 from django.db.models.signals import post_save
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.models import User
 from django.db import models
 from django.db.models.signals import post_save
 from django.contrib.auth.models import AbstractUser
+from django.db.models import OuterRef, Subquery
 from django.conf import settings
+from django.utils import timezone
+from . import blocking, phones
+from .tenancy import get_tenant
 import uuid
 class User(AbstractUser):
     is_organisor = models.BooleanField(default=True)
@@ -14,14 +18,52 @@ class User(AbstractUser):
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
+    # numëruesit mbahen nga leads/counters.py; `recount_leads` i rregullon
+    lead_count = models.PositiveIntegerField(default=0)
+    # ndryshimi i fundit i kategorive të organizatës; validator-i i faqes së lead-it (conditional.py)
+    categories_updated_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return self.user.username
 
 
-class LeadManager(models.Manager):
-    def get_queryset(self):
-        return super().get_queryset()
+class OrganisationQuerySet(models.QuerySet):
+    """Modele me fushën `organisation`: filtrim me id-në e organizatës, pa join."""
+
+    def for_org(self, organisation):
+        return self.filter(organisation_id=getattr(organisation, "pk", organisation))
+
+    def for_user(self, user):
+        tenant = get_tenant(user)
+        if not tenant:
+            return self.none()
+        return self.for_org(tenant.organisation_id)
+
+
+class LeadQuerySet(OrganisationQuerySet):
+    def for_user(self, user):
+        """Organizatori sheh gjithë organizatën; agjenti vetëm leads e veta."""
+        tenant = get_tenant(user)
+        queryset = super().for_user(user)
+        if tenant and not tenant.is_organisor:
+            queryset = queryset.filter(agent_id=tenant.agent_id)
+        return queryset
+
+    def with_list_data(self):
+        """
+        Ngarkon agjentin, kategorinë dhe shënimin e fundit në të njëjtin query,
+        që faqja e listës të mos bëjë një query për çdo rresht.
+        """
+        latest_followup = FollowUp.objects.filter(
+            lead=OuterRef("pk")
+        ).order_by("-date_added", "-id")
+        return self.select_related("agent__user", "category").annotate(
+            latest_followup_notes=Subquery(latest_followup.values("notes")[:1])
+        )
+
+
+class LeadManager(models.Manager.from_queryset(LeadQuerySet)):
+    pass
 
 
 class Lead(models.Model):
@@ -33,8 +75,16 @@ class Lead(models.Model):
     agent = models.ForeignKey("Agent", null=True, blank=True, on_delete=models.SET_NULL)
     category = models.ForeignKey("Category", related_name="leads", null=True, blank=True, on_delete=models.SET_NULL)
     date_added = models.DateTimeField(auto_now_add=True)
+    # çdo ndryshim i lead-it ose i follow-up-eve të tij; validatori i GET-it të kushtëzuar
+    updated_at = models.DateTimeField(auto_now=True)
     phone_number = models.CharField(max_length=20)
+    # numri i normalizuar (shifra E.164) dhe i kthyer së prapthi për kërkim me prapashtesë
+    phone_digits = models.CharField(max_length=20, blank=True, default="", editable=False)
+    phone_digits_rev = models.CharField(max_length=20, blank=True, default="", editable=False)
     email = models.EmailField()
+    # çelësat e "blocking" për gjetjen e dublikatave (leads/dedup.py)
+    email_key = models.CharField(max_length=254, blank=True, default="", editable=False)
+    name_key = models.CharField(max_length=8, blank=True, default="", editable=False)
     profile_picture = models.ImageField(null=True, blank=True, upload_to="profile_pictures/")
     converted_date = models.DateTimeField(null=True, blank=True)
     service = models.CharField(max_length=100, blank=True, null=True)
@@ -42,16 +92,85 @@ class Lead(models.Model):
 
     objects = LeadManager()
 
+    # fushat që sinjalet krahasojnë me vlerat që ishin në DB: FK-të me
+    # numërues `lead_count`, data e konvertimit dhe fushat e autocomplete-it
+    TRACKED_FIELDS = (
+        "organisation_id", "agent_id", "category_id", "converted_date",
+        "first_name", "last_name", "email", "phone_number",
+    )
+
+    class Meta:
+        # të gjitha query-t e listës/dashboard-it filtrojnë sipas organizatës,
+        # pastaj agjentit/kategorisë, dhe renditen sipas datës ose emrit
+        indexes = [
+            models.Index(fields=["organisation", "date_added", "id"], name="lead_org_date_idx"),
+            models.Index(fields=["organisation", "agent", "date_added", "id"], name="lead_org_agent_date_idx"),
+            models.Index(fields=["organisation", "category", "date_added", "id"], name="lead_org_cat_date_idx"),
+            models.Index(fields=["organisation", "first_name", "id"], name="lead_org_first_name_idx"),
+            models.Index(fields=["organisation", "category", "converted_date"], name="lead_org_cat_converted_idx"),
+            models.Index(fields=["organisation", "phone_digits"], name="lead_org_phone_idx"),
+            models.Index(fields=["organisation", "phone_digits_rev"], name="lead_org_phone_rev_idx"),
+            models.Index(fields=["organisation", "email_key"], name="lead_org_email_key_idx"),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # vlerat siç janë në DB, që sinjalet të dinë nga ku po ndryshon lead-i
+        if all(field in instance.__dict__ for field in cls.TRACKED_FIELDS):
+            instance._loaded_values = instance.tracked_values()
+        return instance
+
+    def tracked_values(self):
+        return {field: getattr(self, field) for field in self.TRACKED_FIELDS}
+
+    def normalize_phone(self):
+        self.phone_digits = phones.normalize(self.phone_number)
+        self.phone_digits_rev = self.phone_digits[::-1]
+
+    def compute_keys(self):
+        """Kolonat e derivuara: numri i normalizuar dhe çelësat e dublikatave."""
+        self.normalize_phone()
+        self.email_key = blocking.email_key(self.email)
+        self.name_key = blocking.name_key(self.first_name, self.last_name)
+
+    def save(self, *args, **kwargs):
+        self.compute_keys()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if "phone_number" in update_fields:
+                update_fields |= {"phone_digits", "phone_digits_rev"}
+            if "email" in update_fields:
+                update_fields.add("email_key")
+            if update_fields & {"first_name", "last_name"}:
+                update_fields.add("name_key")
+            update_fields.add("updated_at")
+            kwargs["update_fields"] = update_fields
+        if not self._state.adding and not hasattr(self, "_loaded_values"):
+            # ndërtuar me pk ose me only(): vlerat e vjetra lexohen këtu
+            self._loaded_values = (
+                Lead.objects.filter(pk=self.pk).values(*self.TRACKED_FIELDS).first() or {}
+            )
+        # sinjalet post_save (numëruesit, statistikat) janë në të njëjtin transaksion
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+        self._loaded_values = self.tracked_values()
     
     @property
     def last_followup_note(self):
-        followup = self.followups.order_by('-date_added').first()
-        if followup and followup.notes:
+        # vjen nga with_list_data(); përndryshe bëjmë query-n si më parë
+        if hasattr(self, "latest_followup_notes"):
+            notes = self.latest_followup_notes
+        else:
+            followup = self.followups.order_by('-date_added', '-id').first()
+            notes = followup.notes if followup else None
+        if notes:
             # merr vetëm 30 karaktere dhe shto "..." nëse është më gjatë
-            return followup.notes[:30] + ("..." if len(followup.notes) > 30 else "")
+            return notes[:30] + ("..." if len(notes) > 30 else "")
         return "—"
 
 def handle_upload_follow_ups(instance, filename):
@@ -64,6 +183,11 @@ class FollowUp(models.Model):
     notes = models.TextField(blank=True, null=True)
     file = models.FileField(null=True, blank=True, upload_to=handle_upload_follow_ups)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["lead", "date_added"], name="followup_lead_date_idx"),
+        ]
+
     def __str__(self):
         return f"{self.lead.first_name} {self.lead.last_name} - {self.agent.get_full_name()}"
 
@@ -71,6 +195,9 @@ class FollowUp(models.Model):
 class Agent(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     organisation = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
+    lead_count = models.PositiveIntegerField(default=0)
+
+    objects = OrganisationQuerySet.as_manager()
 
     def __str__(self):
         return self.user.email
@@ -79,6 +206,9 @@ class Agent(models.Model):
 class Category(models.Model):
     name = models.CharField(max_length=30)  # New, Contacted, Converted, Unconverted
     organisation = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
+    lead_count = models.PositiveIntegerField(default=0)
+
+    objects = OrganisationQuerySet.as_manager()
 
     def __str__(self):
         return self.name
@@ -97,8 +227,148 @@ class Notification(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     message = models.TextField()
     url = models.CharField(max_length=200, blank=True)  # link për lead ose faqe
+    # njoftimet e të njëjtit lloj bashkohen në një ("5 leads të reja"); shih notifications.py
+    kind = models.CharField(max_length=30, blank=True)
+    count = models.PositiveIntegerField(default=1)
     read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "read", "created_at"], name="notif_user_read_created_idx"),
+            models.Index(fields=["user", "created_at"], name="notif_user_created_idx"),
+            # vetëm për `prune_notifications`: njoftimet e lexuara sipas moshës
+            models.Index(fields=["created_at"], condition=models.Q(read=True), name="notif_read_created_idx"),
+            # vetëm të palexuarat: numëruesi i /metrics pa skanuar gjithë tabelën
+            models.Index(fields=["user"], condition=models.Q(read=False), name="notif_unread_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"Notification for {self.user.username}: {self.message}"
+
+
+class NotificationArchive(models.Model):
+    """Njoftime të lexuara të nxjerra nga tabela kryesore nga `prune_notifications --archive`."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="archived_notifications")
+    message = models.TextField()
+    url = models.CharField(max_length=200, blank=True)
+    kind = models.CharField(max_length=30, blank=True)
+    count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived notification for {self.user_id}: {self.message}"
+
+class OutgoingEmail(models.Model):
+    """Email në radhë; e dërgon komanda `send_queued_mail`, jo request-i."""
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_status_next_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)} ({self.status})"
+
+
+class LeadDailyStat(models.Model):
+    """
+    Rollup ditor i ngjarjeve të leads: sa u krijuan dhe sa u konvertuan,
+    sipas organizatës, agjentit dhe kategorisë. Agjenti/kategoria ruhen si
+    numra (0 = pa agjent/kategori), që historia të mbetet kur ato fshihen.
+    """
+    organisation = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
+    agent_key = models.PositiveIntegerField(default=0)
+    category_key = models.PositiveIntegerField(default=0)
+    day = models.DateField()
+    created = models.PositiveIntegerField(default=0)
+    converted = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # indeksi i tij shërben edhe query-t sipas intervalit të datave
+            models.UniqueConstraint(
+                fields=["organisation", "day", "agent_key", "category_key"],
+                name="lead_daily_stat_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.organisation} {self.day}: +{self.created} / {self.converted} konvertime"
+
+
+class LeadSearchTerm(models.Model):
+    """
+    Prefikset për autocomplete: një rresht për emrin, mbiemrin, emrin e plotë,
+    email-in dhe telefonin e çdo lead-i, të normalizuar (pa diakritikë, lowercase).
+    Kërkimi "ar" bëhet range scan mbi indeksin (organisation, term).
+    """
+    organisation = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
+    lead = models.ForeignKey(Lead, related_name="search_terms", on_delete=models.CASCADE)
+    term = models.CharField(max_length=254)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["organisation", "term"], name="lead_search_term_idx"),
+        ]
+
+    def __str__(self):
+        return self.term
+
+
+class DuplicateCandidate(models.Model):
+    """
+    Një lead (`lead`) që duket si dublikatë e një lead-i më të vjetër
+    (`duplicate_of`). `reasons` tregon cilët çelësa përputhen.
+    """
+    organisation = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
+    lead = models.ForeignKey(Lead, related_name="duplicate_candidates", on_delete=models.CASCADE)
+    duplicate_of = models.ForeignKey(Lead, related_name="+", on_delete=models.CASCADE)
+    reasons = models.CharField(max_length=50)  # p.sh. "email,phone"
+    score = models.FloatField()
+    dismissed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["lead", "duplicate_of"], name="duplicate_candidate_pair"),
+        ]
+        indexes = [
+            models.Index(fields=["organisation", "dismissed", "created_at"], name="duplicate_org_open_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.lead} ≈ {self.duplicate_of} ({self.reasons})"
+
+
+class LeadSubmission(models.Model):
+    """
+    Forma publike e shton këtu kërkesën me një INSERT të vetëm;
+    komanda `process_lead_submissions` i kthen në leads me batch.
+    """
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
     def __str__(self):
-        return f"Notification for {self.user.username}: {self.message}"
\ No newline at end of file
+        return f"Submission {self.pk} ({self.created_at:%Y-%m-%d %H:%M})"
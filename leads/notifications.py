@@ -0,0 +1,233 @@
+import contextvars
+import datetime
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Window
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.urls import reverse
+from django.utils.timezone import now
+
+from . import metrics
+from .models import Notification, NotificationArchive
+from .pubsub import get_broker
+
+
+SUMMARY_SIZE = 5
+
+NEW_LEADS = "new_leads"
+LEADS_ASSIGNED = "leads_assigned"
+# llojet që bashkohen: njoftimi i palexuar i të njëjtit lloj brenda dritares
+# përditësohet (count += n) në vend që të shtohet një rresht i ri
+COALESCED_MESSAGES = {
+    NEW_LEADS: "{count} leads të reja",
+    LEADS_ASSIGNED: "U caktuan {count} leads tek ju",
+}
+
+_batch = contextvars.ContextVar("notification_batch", default=None)
+
+
+def serialize(notification):
+    return {
+        "id": notification.id,
+        "message": notification.message,
+        "url": notification.url or "",
+        "count": notification.count,
+        "created_at": notification.created_at.isoformat(),
+        "read": notification.read,
+    }
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+def publish(notification):
+    get_broker().publish(user_channel(notification.user_id), serialize(notification))
+
+
+def notify(user_id, message, url="", kind="", count=1):
+    """
+    Shton një njoftim. Brenda `batch()` mblidhet dhe shkruhet në fund me një
+    bulk_create; jashtë tij shkruhet menjëherë.
+    """
+    notification = Notification(user_id=user_id, message=message, url=url, kind=kind, count=count)
+    pending = _batch.get()
+    if pending is None:
+        flush([notification])
+    else:
+        pending.append(notification)
+
+
+def notify_new_leads(user_id, leads):
+    if len(leads) == 1:
+        lead = leads[0]
+        notify(
+            user_id,
+            f"New lead: {lead.first_name} {lead.last_name}",
+            reverse("leads:lead-detail", kwargs={"pk": lead.pk}),
+            kind=NEW_LEADS,
+        )
+    elif leads:
+        notify(user_id, "", kind=NEW_LEADS, count=len(leads))
+
+
+@contextmanager
+def batch():
+    """
+    Mbledh njoftimet e një request-i, importi ose job-i dhe i shkruan në dalje.
+    Nëse blloku ngre exception, njoftimet hidhen bashkë me punën.
+    """
+    if _batch.get() is not None:
+        # batch i brendshëm: i bashkohet të jashtmit
+        yield
+        return
+    pending = []
+    token = _batch.set(pending)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+    flush(pending)
+
+
+def coalesce_window():
+    return datetime.timedelta(seconds=getattr(settings, "NOTIFICATION_COALESCE_WINDOW", 300))
+
+
+def render_count(notification):
+    if notification.count > 1 or not notification.message:
+        notification.message = COALESCED_MESSAGES[notification.kind].format(count=notification.count)
+        notification.url = reverse("leads:lead-list")
+
+
+def flush(pending):
+    """
+    Bashkon njoftimet e bashkueshme për (user, lloj), përditëson ato të palexuara
+    brenda dritares dhe fut të tjerat me një bulk_create.
+    """
+    if not pending:
+        return []
+    new, merged = [], {}
+    for notification in pending:
+        key = (notification.user_id, notification.kind)
+        if notification.kind not in COALESCED_MESSAGES:
+            new.append(notification)
+        elif key in merged:
+            merged[key].count += notification.count
+        else:
+            merged[key] = notification
+            new.append(notification)
+
+    with transaction.atomic():
+        updated = []
+        if merged:
+            recent = Q()
+            for user_id, kind in merged:
+                recent |= Q(user_id=user_id, kind=kind)
+            existing = {}
+            rows = (
+                Notification.objects.select_for_update()
+                .filter(recent, read=False, created_at__gte=now() - coalesce_window())
+                .order_by("created_at", "id")
+            )
+            for row in rows:
+                existing[(row.user_id, row.kind)] = row  # mbetet më i fundit
+            for key, notification in merged.items():
+                row = existing.get(key)
+                if row is not None:
+                    row.count += notification.count
+                    row.created_at = now()
+                    render_count(row)
+                    updated.append(row)
+                    new.remove(notification)
+                else:
+                    render_count(notification)
+            Notification.objects.bulk_update(updated, ["count", "message", "url", "created_at"])
+        created = Notification.objects.bulk_create(new)
+
+    metrics.NOTIFICATIONS_CREATED.inc(len(created))
+    changed = created + updated
+    invalidate_summary(*{notification.user_id for notification in changed})
+    transaction.on_commit(lambda: [publish(notification) for notification in changed])
+    return changed
+
+
+ARCHIVED_FIELDS = ("user_id", "message", "url", "kind", "count", "created_at")
+
+
+def prune_read(older_than, batch_size=1000, archive=False, pause=0):
+    """
+    Fshin (ose arkivon te NotificationArchive) njoftimet e lexuara më të vjetra
+    se `older_than`, `batch_size` rreshta për transaksion, që tabela të mos
+    bllokohet gjatë. Njoftimet e palexuara nuk preken. Kthen sa u hoqën.
+    """
+    cutoff = now() - older_than
+    removed = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Notification.objects.filter(read=True, created_at__lt=cutoff)
+                .order_by("created_at")
+                .values("id", *ARCHIVED_FIELDS)[:batch_size]
+            )
+            if not rows:
+                return removed
+            if archive:
+                NotificationArchive.objects.bulk_create([
+                    NotificationArchive(**{field: row[field] for field in ARCHIVED_FIELDS})
+                    for row in rows
+                ])
+            # delete() i zakonshëm: post_delete pastron përmbledhjen e cache-uar të userit
+            Notification.objects.filter(id__in=[row["id"] for row in rows]).delete()
+        removed += len(rows)
+        if len(rows) < batch_size:
+            return removed
+        if pause:
+            time.sleep(pause)
+
+
+def summary_cache_key(user_id):
+    return f"notifications:summary:{user_id}"
+
+
+def get_summary(user):
+    """
+    Numri i njoftimeve të palexuara dhe 5 të fundit, nga cache.
+    Kur s'është në cache, të dyja merren me një query të vetme (COUNT si window).
+    """
+    key = summary_cache_key(user.pk)
+    summary = cache.get(key)
+    if summary is None:
+        rows = list(
+            Notification.objects.filter(user=user, read=False)
+            .annotate(unread_total=Window(Count("id")))
+            .order_by("-created_at", "-id")
+            .values("id", "message", "url", "read", "created_at", "unread_total")[:SUMMARY_SIZE]
+        )
+        summary = {
+            "unread_count": rows[0]["unread_total"] if rows else 0,
+            "items": [
+                {key: value for key, value in row.items() if key != "unread_total"}
+                for row in rows
+            ],
+        }
+        cache.set(key, summary, getattr(settings, "NOTIFICATION_SUMMARY_TIMEOUT", 300))
+    return summary
+
+
+def invalidate_summary(*user_ids):
+    cache.delete_many([summary_cache_key(user_id) for user_id in user_ids])
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def notification_changed(sender, instance, **kwargs):
+    invalidate_summary(instance.user_id)
+    if kwargs.get("created"):
+        # dërgohet vetëm pasi rreshti është i dukshëm për lexuesit e tjerë
+        transaction.on_commit(lambda: publish(instance))
@@ -0,0 +1,129 @@
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+def flip(field):
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+def seek(queryset, ordering, values, reverse=False):
+    """
+    Keyset ("seek") query: kthen rreshtat që vijnë menjëherë pas `values`
+    sipas `ordering`, pa OFFSET dhe pa numëruar gjithë tabelën.
+    Me reverse=True kthen rreshtat para `values`, në rend të kundërt.
+    """
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") != reverse else "gt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+
+    if reverse:
+        ordering = [flip(field) for field in ordering]
+    return queryset.filter(condition).order_by(*ordering)
+
+
+def row_values(row, ordering):
+    """Vlerat e fushave të renditjes për një rresht (objekt ose dict)."""
+    names = [field.lstrip("-") for field in ordering]
+    if isinstance(row, dict):
+        return [row[name] for name in names]
+    return [getattr(row, name) for name in names]
+
+
+class KeysetPage:
+    """Faqe e KeysetPaginator-it; ka të njëjtat metoda bazë si Page i Django-s."""
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Faqosje me cursor sipas renditjes aktive (p.sh. date_added + id).
+    Nuk bën COUNT(*) dhe as OFFSET, ndaj faqja e 1000-të kushton sa e para.
+    Cursor-i është opak për klientin: drejtimi, renditja dhe vlerat e rreshtit
+    kufitar, në base64.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = max(int(per_page), 1)
+        self.ordering = list(ordering)
+
+    def encode_cursor(self, row, direction):
+        values = [
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in row_values(row, self.ordering)
+        ]
+        payload = json.dumps([direction, self.ordering, values], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        """Kthen (drejtimi, vlerat) ose None nëse cursor-i është bosh/i pavlefshëm."""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            direction, ordering, values = json.loads(base64.urlsafe_b64decode(padded))
+            if direction not in ("next", "prev") or ordering != self.ordering:
+                return None
+            values = [
+                self.to_python(field.lstrip("-"), value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (ValueError, TypeError, LookupError, ValidationError):
+            return None
+        return direction, values
+
+    def to_python(self, name, value):
+        try:
+            field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # anotim (p.sh. search_rank), jo fushë e modelit
+            field = self.queryset.query.annotations[name].output_field
+        return field.to_python(value)
+
+    def get_page(self, cursor=None):
+        limit = self.per_page + 1  # një rresht më shumë tregon nëse ka faqe tjetër
+        decoded = self.decode_cursor(cursor)
+
+        if decoded is None:
+            rows = list(self.queryset.order_by(*self.ordering)[:limit])
+            has_next, has_previous = len(rows) > self.per_page, False
+            rows = rows[:self.per_page]
+        elif decoded[0] == "next":
+            rows = list(seek(self.queryset, self.ordering, decoded[1])[:limit])
+            has_next, has_previous = len(rows) > self.per_page, True
+            rows = rows[:self.per_page]
+        else:
+            rows = list(seek(self.queryset, self.ordering, decoded[1], reverse=True)[:limit])
+            has_next, has_previous = True, len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+
+        next_cursor = self.encode_cursor(rows[-1], "next") if has_next and rows else None
+        previous_cursor = self.encode_cursor(rows[0], "prev") if has_previous and rows else None
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
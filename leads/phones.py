@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db.models import Q
+
+
+SUFFIX_MIN_DIGITS = 6
+PHONE_CHARS = set("0123456789 +-()./")
+
+
+def default_country_code():
+    return getattr(settings, "PHONE_DEFAULT_COUNTRY_CODE", "355")
+
+
+def normalize(raw, country_code=None):
+    """
+    Numri si shifra E.164 pa "+": "+355 69 123 4567", "00355691234567",
+    "069 123 4567" dhe "691234567" → "355691234567".
+    Numrat pa prefiks ndërkombëtar marrin kodin e vendit nga settings.
+    """
+    raw = (raw or "").strip()
+    digits = "".join(ch for ch in raw if ch.isdigit())
+    if not digits:
+        return ""
+    country_code = country_code or default_country_code()
+    if raw.startswith("+"):
+        return digits
+    if digits.startswith("00"):
+        return digits[2:]
+    if digits.startswith("0"):
+        # prefiksi kombëtar 0 zëvendësohet me kodin e vendit
+        return country_code + digits[1:]
+    if len(digits) <= 9:
+        return country_code + digits
+    return digits
+
+
+def is_phone_query(query):
+    """Vetëm shifra dhe shenjat e zakonshme të telefonit (hapësira, +, -, ...)."""
+    return bool(query) and any(ch.isdigit() for ch in query) and set(query) <= PHONE_CHARS
+
+
+def phone_lookup(query):
+    """
+    Kushti për kërkimin me numër: përputhje e saktë me numrin e normalizuar,
+    ose (nga 6 shifra e lart) numri mbaron me shifrat e dhëna. Prapashtesa
+    kërkohet si prefiks mbi kolonën e kthyer së prapthi, që ta shërbejë indeksi.
+    """
+    condition = Q(phone_digits=normalize(query))
+    digits = "".join(ch for ch in query if ch.isdigit())
+    if len(digits) >= SUFFIX_MIN_DIGITS:
+        reversed_digits = digits[::-1]
+        suffix = Q(phone_digits_rev__gte=reversed_digits)
+        upper = next_prefix(reversed_digits)
+        if upper:
+            suffix &= Q(phone_digits_rev__lt=upper)
+        condition |= suffix
+    return condition
+
+
+def next_prefix(digits):
+    """
+    Vargu më i vogël pas të gjithë vargjeve që fillojnë me `digits`
+    ("7659" → "766"); vetëm shifra, që krahasimi të mos varet nga collation-i.
+    """
+    stripped = digits.rstrip("9")
+    if not stripped:
+        return None
+    return stripped[:-1] + str(int(stripped[-1]) + 1)
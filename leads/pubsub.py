@@ -0,0 +1,148 @@
+import asyncio
+import collections
+import json
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """
+    Radha e mesazheve të një abonenti. Lexohet si nga kodi sync (get)
+    ashtu edhe nga ai async (aget), ndërsa publish mund të vijë nga çdo thread.
+    """
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self._messages = collections.deque(maxlen=100)
+        self._condition = threading.Condition()
+        self._waiters = []
+
+    def put(self, message):
+        with self._condition:
+            self._messages.append(message)
+            self._condition.notify_all()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def get(self, timeout=None):
+        """Pret deri në `timeout` sekonda; kthen mesazhin ose None."""
+        with self._condition:
+            if not self._messages:
+                self._condition.wait(timeout)
+            return self._messages.popleft() if self._messages else None
+
+    async def aget(self, timeout=None):
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            if self._messages:
+                return self._messages.popleft()
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        with self._condition:
+            return self._messages.popleft() if self._messages else None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class InProcessBroker:
+    """
+    Pub/sub brenda procesit. Mjafton kur ka një proces të vetëm
+    (runserver, uvicorn me një worker); për disa workers shih RedisBroker.
+    """
+
+    def __init__(self, **options):
+        self._lock = threading.Lock()
+        self._subscriptions = collections.defaultdict(set)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+    def publish(self, channel, message):
+        self.deliver(channel, message)
+
+    def deliver(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(message)
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Publikon përmes Redis PUBLISH që mesazhi të arrijë në të gjithë workers;
+    çdo proces ka një thread që dëgjon dhe ua shpërndan abonentëve lokalë.
+    Kërkon paketën `redis` (nuk është në requirements.txt).
+    """
+
+    prefix = "crm:"
+
+    def __init__(self, url="redis://localhost:6379/0", **options):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as exc:
+            raise ImproperlyConfigured("RedisBroker kërkon paketën 'redis'.") from exc
+        self._redis = redis.Redis.from_url(url)
+        self._listener = None
+
+    def subscribe(self, channel):
+        self._start_listener()
+        return super().subscribe(channel)
+
+    def publish(self, channel, message):
+        self._redis.publish(self.prefix + channel, json.dumps(message))
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is not None:
+                return
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe(self.prefix + "*")
+            self._listener = threading.Thread(target=self._listen, args=(pubsub,), daemon=True)
+            self._listener.start()
+
+    def _listen(self, pubsub):
+        for item in pubsub.listen():
+            channel = item["channel"].decode()[len(self.prefix):]
+            self.deliver(channel, json.loads(item["data"]))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Broker-i i konfiguruar te settings.NOTIFICATION_BROKER (një për proces)."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            config = getattr(settings, "NOTIFICATION_BROKER", {})
+            backend = import_string(config.get("BACKEND", "leads.pubsub.InProcessBroker"))
+            _broker = backend(**config.get("OPTIONS", {}))
+        return _broker
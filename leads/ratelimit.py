@@ -0,0 +1,143 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils.module_loading import import_string
+
+
+class MemoryStore:
+    """Kovat në memorien e procesit; për testet dhe për një worker të vetëm."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, buckets, now):
+        with self._lock:
+            levels, retry_after = consume(buckets, self._buckets, now)
+            self._buckets.update({key: (tokens, now) for key, tokens in levels.items()})
+            return retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheStore:
+    """
+    Kovat në cache-in e Django-s (Redis/Memcached), të përbashkëta për të gjithë
+    workers. get+set nuk është atomik: nën konkurrencë mund të kalojnë disa
+    kërkesa më shumë se kufiri, por kurrë pa kufi.
+    """
+
+    def __init__(self, alias="default", prefix="ratelimit"):
+        self.alias = alias
+        self.prefix = prefix
+
+    def take(self, buckets, now):
+        store = caches[self.alias]
+        stored = store.get_many([f"{self.prefix}:{key}" for key, _, _ in buckets])
+        current = {key[len(self.prefix) + 1:]: value for key, value in stored.items()}
+        levels, retry_after = consume(buckets, current, now)
+        for key, capacity, rate in buckets:
+            tokens = levels[key]
+            # pas kësaj kohe kova është sërish plot, s'ka nevojë të mbahet
+            store.set(f"{self.prefix}:{key}", (tokens, now), int((capacity - tokens) / rate) + 1)
+        return retry_after
+
+    def clear(self):
+        pass
+
+
+def consume(buckets, current, now):
+    """
+    Mbush kovat [(key, capacity, rate)] sipas kohës së kaluar dhe merr nga një
+    token në secilën, por vetëm nëse të gjitha kanë: një kovë bosh nuk i harxhon
+    tokenat e të tjerave. `current` është {key: (tokens, updated)}.
+    Kthen ({key: tokens}, 0) ose ({key: tokens}, sekondat deri sa të gjitha të kenë token).
+    """
+    levels = {}
+    retry_after = 0
+    for key, capacity, rate in buckets:
+        tokens, updated = current.get(key, (capacity, now))
+        levels[key] = min(capacity, tokens + (now - updated) * rate)
+        if levels[key] < 1:
+            retry_after = max(retry_after, (1 - levels[key]) / rate)
+    if not retry_after:
+        levels = {key: tokens - 1 for key, tokens in levels.items()}
+    return levels, retry_after
+
+
+class RateLimiter:
+    """
+    Disa kova për të njëjtin endpoint, p.sh. {"ip": (5, 60), "global": (300, 60)}:
+    `capacity` kërkesa menjëherë (burst), që rimbushen plotësisht për `period` sekonda.
+    Kërkesa pranohet vetëm nëse ka token në çdo kovë.
+    """
+
+    def __init__(self, name, limits, store):
+        self.name = name
+        self.limits = limits
+        self.store = store
+
+    def keys(self, request):
+        for scope, (capacity, period) in self.limits.items():
+            suffix = client_ip(request) if scope == "ip" else scope
+            yield f"{self.name}:{scope}:{suffix}", capacity, capacity / period
+
+    def check(self, request):
+        """0 nëse kërkesa pranohet, përndryshe sa sekonda të priten."""
+        retry_after = self.store.take(list(self.keys(request)), time.time())
+        record(self.name, "rejected" if retry_after else "accepted")
+        return retry_after
+
+
+def client_ip(request):
+    # pas proxy-t (Heroku, nginx) REMOTE_ADDR është adresa e proxy-t
+    if getattr(settings, "RATE_LIMIT_TRUST_FORWARDED_FOR", False):
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def counter_key(name, outcome):
+    return f"ratelimit:count:{name}:{outcome}"
+
+
+def record(name, outcome):
+    key = counter_key(name, outcome)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # çelësi skadoi mes add() dhe incr()
+            cache.set(key, 1, None)
+
+
+def get_counts(name):
+    """{"accepted": n, "rejected": n} për endpoint-in `name`."""
+    outcomes = ("accepted", "rejected")
+    values = cache.get_many([counter_key(name, outcome) for outcome in outcomes])
+    return {outcome: values.get(counter_key(name, outcome), 0) for outcome in outcomes}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Store-i i konfiguruar te settings.RATE_LIMIT_STORE (një për proces)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            config = getattr(settings, "RATE_LIMIT_STORE", {})
+            backend = import_string(config.get("BACKEND", "leads.ratelimit.CacheStore"))
+            _store = backend(**config.get("OPTIONS", {}))
+        return _store
+
+
+def get_limiter(name):
+    limits = getattr(settings, "RATE_LIMITS", {}).get(name, {})
+    return RateLimiter(name, limits, get_store())
@@ -0,0 +1,176 @@
+import re
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .phones import is_phone_query
+
+
+MAX_TOKENS = 8
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokens(query):
+    """Fjalët e kërkimit, pa shenja; çdo fjalë kërkohet si prefiks."""
+    return TOKEN_RE.findall((query or "").lower())[:MAX_TOKENS]
+
+
+def is_text_query(query):
+    # numrat e telefonit (dhe ID-të) kërkohen te filters.py
+    return bool(query) and not is_phone_query(query)
+
+
+class IContainsBackend:
+    """LIKE '%q%' mbi emrin, mbiemrin dhe email-in: pa indeks, për DB të tjera."""
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(first_name__icontains=query) |
+            Q(last_name__icontains=query) |
+            Q(email__icontains=query)
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def install(self, db_connection):
+        pass
+
+    def uninstall(self, db_connection):
+        pass
+
+
+class SQLiteFTSBackend(IContainsBackend):
+    """
+    Tabelë virtuale FTS5 me "external content" mbi leads_lead: mban vetëm
+    indeksin, ndërsa trigger-at e sinkronizojnë në çdo INSERT/UPDATE/DELETE
+    (edhe për bulk_create dhe queryset.update(), që s'lëshojnë sinjale).
+    """
+    TABLE = "leads_lead_fts"
+    TRIGGERS = {
+        "leads_lead_fts_ai": """
+            AFTER INSERT ON leads_lead BEGIN
+                INSERT INTO leads_lead_fts(rowid, first_name, last_name, email)
+                VALUES (new.id, new.first_name, new.last_name, new.email);
+            END""",
+        "leads_lead_fts_ad": """
+            AFTER DELETE ON leads_lead BEGIN
+                INSERT INTO leads_lead_fts(leads_lead_fts, rowid, first_name, last_name, email)
+                VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+            END""",
+        "leads_lead_fts_au": """
+            AFTER UPDATE OF first_name, last_name, email ON leads_lead BEGIN
+                INSERT INTO leads_lead_fts(leads_lead_fts, rowid, first_name, last_name, email)
+                VALUES ('delete', old.id, old.first_name, old.last_name, old.email);
+                INSERT INTO leads_lead_fts(rowid, first_name, last_name, email)
+                VALUES (new.id, new.first_name, new.last_name, new.email);
+            END""",
+    }
+
+    def search(self, queryset, query):
+        words = tokens(query)
+        if not words:
+            return super().search(queryset, query)
+        match = " ".join(f'"{word}"*' for word in words)
+        # bm25 është negativ (më i vogli = më i mirë); emri peshon më shumë se email-i
+        rank = RawSQL(
+            f'SELECT -bm25({self.TABLE}, 2.0, 2.0, 1.0) FROM {self.TABLE} '
+            f'WHERE {self.TABLE} MATCH %s AND rowid = "leads_lead"."id"',
+            (match,),
+            output_field=FloatField(),
+        )
+        matches = RawSQL(f"SELECT rowid FROM {self.TABLE} WHERE {self.TABLE} MATCH %s", (match,))
+        return queryset.filter(id__in=matches).annotate(search_rank=rank)
+
+    def install(self, db_connection):
+        """
+        Idempotent: thirret nga migrimi dhe pas çdo `migrate`, sepse SQLite
+        e rindërton tabelën leads_lead në disa AlterField/AddField dhe
+        trigger-at humbasin bashkë me tabelën e vjetër.
+        """
+        with db_connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'leads_lead'"
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.TABLE} USING fts5("
+                "first_name, last_name, email, content='leads_lead', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+            missing = [name for name in self.TRIGGERS if name not in existing]
+            for name in missing:
+                cursor.execute(f"CREATE TRIGGER {name} {self.TRIGGERS[name]}")
+            if missing:
+                cursor.execute(f"INSERT INTO {self.TABLE}({self.TABLE}) VALUES ('rebuild')")
+
+    def uninstall(self, db_connection):
+        with db_connection.cursor() as cursor:
+            for name in self.TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"DROP TABLE IF EXISTS {self.TABLE}")
+
+
+class PostgresSearchBackend(IContainsBackend):
+    """
+    tsvector mbi emrin, mbiemrin dhe email-in me një indeks GIN mbi shprehjen:
+    Postgres e mban vetë në sinkron, pa kolonë shtesë dhe pa trigger-a.
+    Query-t duhet të përdorin saktësisht të njëjtën shprehje që të kapin indeksin.
+    """
+    INDEX = "lead_search_vector_idx"
+    # '@' dhe '.' → hapësirë, që "example" të gjejë "ana@example.com"
+    VECTOR = (
+        "to_tsvector('simple', coalesce({table}first_name, '') || ' ' || "
+        "coalesce({table}last_name, '') || ' ' || translate(coalesce({table}email, ''), '@.', '  '))"
+    )
+
+    def search(self, queryset, query):
+        words = tokens(query)
+        if not words:
+            return super().search(queryset, query)
+        vector = self.VECTOR.format(table='"leads_lead".')
+        tsquery = " & ".join(f"{word}:*" for word in words)
+        return queryset.filter(
+            RawSQL(f"{vector} @@ to_tsquery('simple', %s)", (tsquery,), output_field=BooleanField())
+        ).annotate(search_rank=RawSQL(
+            f"ts_rank({vector}, to_tsquery('simple', %s))", (tsquery,), output_field=FloatField()
+        ))
+
+    def install(self, db_connection):
+        with db_connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.INDEX} ON leads_lead "
+                f"USING GIN ({self.VECTOR.format(table='')})"
+            )
+
+    def uninstall(self, db_connection):
+        with db_connection.cursor() as cursor:
+            cursor.execute(f"DROP INDEX IF EXISTS {self.INDEX}")
+
+
+VENDOR_BACKENDS = {
+    "sqlite": SQLiteFTSBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def get_search_backend(db_connection=None):
+    """
+    settings.LEAD_SEARCH_BACKEND nëse është vendosur, përndryshe sipas DB-së.
+    """
+    path = getattr(settings, "LEAD_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    vendor = (db_connection or connection).vendor
+    return VENDOR_BACKENDS.get(vendor, IContainsBackend)()
+
+
+def search_leads(queryset, query):
+    """Leads që përputhen me `query`, me anotimin `search_rank` (më i madhi = më i afërti)."""
+    return get_search_backend().search(queryset, query)
+
+
+def install_search_index(using, **kwargs):
+    """Receiver i post_migrate: rikrijon indeksin/trigger-at nëse mungojnë."""
+    db_connection = connections[using]
+    get_search_backend(db_connection).install(db_connection)
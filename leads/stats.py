@@ -0,0 +1,64 @@
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Category, Lead
+
+
+CONVERTED = "Converted"
+
+
+def is_converted(category):
+    # kategoria "Converted" është për organizatë, ndaj krahasohet me emër
+    return category is not None and category.name == CONVERTED
+
+
+def dashboard_cache_key(organisation_id):
+    return f"dashboard:stats:{organisation_id}"
+
+
+def get_dashboard_stats(organisation_id):
+    """
+    Totali, leads e 30 ditëve të fundit dhe të konvertuarit në 30 ditë,
+    me një query të vetme me COUNT të kushtëzuar, nga cache kur mundet.
+    """
+    key = dashboard_cache_key(organisation_id)
+    stats = cache.get(key)
+    if stats is None:
+        thirty_days_ago = timezone.now() - datetime.timedelta(days=30)
+        stats = Lead.objects.for_org(organisation_id).aggregate(
+            total_lead_count=Count("id"),
+            total_in_past30=Count("id", filter=Q(date_added__gte=thirty_days_ago)),
+            converted_in_past30=Count("id", filter=Q(
+                category__name=CONVERTED,
+                converted_date__gte=thirty_days_ago,
+            )),
+        )
+        cache.set(key, stats, getattr(settings, "DASHBOARD_STATS_TIMEOUT", 60))
+    return stats
+
+
+def invalidate_dashboard(*organisation_ids):
+    cache.delete_many([
+        dashboard_cache_key(organisation_id)
+        for organisation_id in organisation_ids
+        if organisation_id is not None
+    ])
+
+
+@receiver(post_save, sender=Lead)
+@receiver(post_delete, sender=Lead)
+def lead_changed(sender, instance, **kwargs):
+    invalidate_dashboard(instance.organisation_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    # riemërtimi nga/në "Converted" ndryshon numrat e konvertimeve
+    invalidate_dashboard(instance.organisation_id)
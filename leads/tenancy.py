@@ -0,0 +1,65 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.apps import apps
+from django.utils.functional import SimpleLazyObject
+
+
+class Tenant:
+    """
+    Organizata e userit (dhe agjenti, për agjentët), si id. Lexohet një herë
+    dhe ruhet te objekti i userit, që çdo query i organizatës ta ripërdorë
+    pa `user.userprofile` / `user.agent.organisation`.
+    """
+    __slots__ = ("organisation_id", "agent_id", "is_organisor")
+
+    def __init__(self, organisation_id=None, agent_id=None, is_organisor=False):
+        self.organisation_id = organisation_id
+        self.agent_id = agent_id
+        self.is_organisor = is_organisor
+
+    def __bool__(self):
+        # user pa organizatë (p.sh. i regjistruar por ende jo agjent)
+        return self.organisation_id is not None
+
+    def __repr__(self):
+        return f"Tenant(organisation_id={self.organisation_id}, agent_id={self.agent_id})"
+
+
+def resolve(user):
+    """Një query i vetëm: profili i organizatorit ose rreshti i agjentit."""
+    if not user.is_authenticated:
+        return Tenant()
+    if user.is_organisor:
+        profiles = apps.get_model("leads", "UserProfile").objects
+        return Tenant(profiles.filter(user_id=user.pk).values_list("pk", flat=True).first(), is_organisor=True)
+    row = apps.get_model("leads", "Agent").objects.filter(user_id=user.pk).values_list("pk", "organisation_id").first()
+    if row is None:
+        return Tenant()
+    agent_id, organisation_id = row
+    return Tenant(organisation_id, agent_id)
+
+
+def get_tenant(user):
+    tenant = getattr(user, "_tenant", None)
+    if tenant is None:
+        tenant = user._tenant = resolve(user)
+    return tenant
+
+
+class TenantMiddleware:
+    """
+    `request.tenant`: organizata e userit, e zgjidhur (dembel) një herë për request.
+    Duhet të vijë pas AuthenticationMiddleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        # pa query këtu: view-t async (stream-i) nuk e prekin
+        request.tenant = SimpleLazyObject(lambda: get_tenant(request.user))
+        return self.get_response(request)
@@ -0,0 +1,32 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from leads.models import User, Lead, Agent, Category, FollowUp
+
+
+class LeadTestCase(TestCase):
+    """Organizatë me një agjent dhe një kategori, me organizatorin të loguar."""
+
+    def setUp(self):
+        cache.clear()
+        self.organisor = User.objects.create_user(username="org", password="pass12345")
+        self.organisation = self.organisor.userprofile
+        agent_user = User.objects.create_user(
+            username="agent", password="pass12345", is_organisor=False, is_agent=True
+        )
+        self.agent = Agent.objects.create(user=agent_user, organisation=self.organisation)
+        self.category = Category.objects.create(name="New", organisation=self.organisation)
+        self.client.login(username="org", password="pass12345")
+
+    def create_leads(self, count):
+        for i in range(count):
+            lead = Lead.objects.create(
+                first_name=f"Lead{i}",
+                last_name="Test",
+                organisation=self.organisation,
+                agent=self.agent,
+                category=self.category,
+                phone_number="0691234567",
+                email=f"lead{i}@example.com",
+            )
+            FollowUp.objects.create(lead=lead, agent=self.organisor, notes=f"Shënim {i}")
@@ -0,0 +1,99 @@
+import datetime
+
+from django.core.management import call_command
+from django.db.models import Sum
+from django.shortcuts import reverse
+from django.utils import timezone
+
+from leads.importing import bulk_insert_leads
+from leads.models import Category, Lead, LeadDailyStat
+from .base import LeadTestCase
+
+
+class LeadDailyStatTest(LeadTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.converted = Category.objects.create(name="Converted", organisation=self.organisation)
+
+    def rollup(self):
+        return sorted(LeadDailyStat.objects.values_list(
+            "agent_key", "category_key", "day", "created", "converted"
+        ))
+
+    def test_create_and_convert_events_are_rolled_up(self):
+        self.create_leads(2)
+        lead = Lead.objects.first()
+        self.client.post(reverse("leads:lead-category-update", args=[lead.pk]), {
+            "category": self.converted.pk,
+        })
+        today = timezone.localdate()
+        self.assertEqual(self.rollup(), [
+            (self.agent.pk, self.category.pk, today, 2, 0),
+            (self.agent.pk, self.converted.pk, today, 0, 1),
+        ])
+        # ruajtje pa ndryshim të converted_date nuk numërohet dy herë
+        Lead.objects.get(pk=lead.pk).save()
+        self.assertEqual(LeadDailyStat.objects.get(category_key=self.converted.pk).converted, 1)
+
+    def converted_per_day(self):
+        return sorted(
+            LeadDailyStat.objects.filter(converted__gt=0)
+            .values_list("day").annotate(n=Sum("converted"))
+        )
+
+    def test_reconverting_moves_the_conversion(self):
+        self.create_leads(1)
+        lead = Lead.objects.get()
+        url = reverse("leads:lead-category-update", args=[lead.pk])
+        self.client.post(url, {"category": self.converted.pk})
+        self.client.post(url, {"category": self.category.pk})
+        self.client.post(url, {"category": self.converted.pk})
+        today = timezone.localdate()
+        self.assertEqual(self.converted_per_day(), [(today, 1)])
+
+        # data e konvertimit ndryshohet: dita e vjetër zbret, e reja rritet
+        lead = Lead.objects.get()
+        lead.converted_date -= datetime.timedelta(days=1)
+        lead.save()
+        incremental = self.converted_per_day()
+        self.assertEqual(incremental, [(today - datetime.timedelta(days=1), 1)])
+
+        call_command("backfill_lead_stats", stdout=None)
+        self.assertEqual(self.converted_per_day(), incremental)
+
+    def test_bulk_insert_and_backfill(self):
+        bulk_insert_leads([
+            Lead(first_name=f"L{i}", last_name="T", organisation=self.organisation,
+                 phone_number="069", email=f"l{i}@example.com")
+            for i in range(3)
+        ])
+        incremental = self.rollup()
+        self.assertEqual(incremental, [(0, 0, timezone.localdate(), 3, 0)])
+
+        LeadDailyStat.objects.all().delete()
+        call_command("backfill_lead_stats", stdout=None)
+        self.assertEqual(self.rollup(), incremental)
+
+    def test_stats_endpoint_reads_only_rollup(self):
+        today = timezone.localdate()
+        LeadDailyStat.objects.bulk_create([
+            LeadDailyStat(organisation=self.organisation, agent_key=self.agent.pk,
+                          day=today - datetime.timedelta(days=1), created=4, converted=1),
+            LeadDailyStat(organisation=self.organisation, agent_key=self.agent.pk,
+                          category_key=self.converted.pk, day=today, created=0, converted=1),
+            LeadDailyStat(organisation=self.organisation, day=today, created=2),
+            LeadDailyStat(organisation=self.organisation, day=today - datetime.timedelta(days=90), created=9),
+        ])
+        with self.assertNumQueries(5):  # sesioni, user-i, profili, rollup-i, agjentët
+            response = self.client.get(reverse("dashboard-stats"))
+        data = response.json()
+        self.assertEqual(data["funnel"], {"created": 6, "converted": 2, "conversion_rate": 0.3333})
+        self.assertEqual(len(data["series"]), 2)
+        agent = next(a for a in data["agents"] if a["agent_id"] == self.agent.pk)
+        self.assertEqual((agent["created"], agent["converted"], len(agent["series"])), (4, 2, 2))
+
+        response = self.client.get(reverse("dashboard-stats"), {"start": "2020-01-01", "end": today.isoformat()})
+        self.assertEqual(response.json()["funnel"]["created"], 15)
+        response = self.client.get(reverse("dashboard-stats"), {"start": "2020-13-01"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,68 @@
+from django.shortcuts import reverse
+
+from leads.autocomplete import PrefixCache, prefix_cache
+from leads.importing import bulk_insert_leads
+from leads.models import Lead, User
+from .base import LeadTestCase
+
+
+class LeadAutocompleteTest(LeadTestCase):
+
+    def setUp(self):
+        super().setUp()
+        prefix_cache.clear()
+        bulk_insert_leads([
+            Lead(first_name="Arbën", last_name="Hoxha", email="arben@example.com",
+                 phone_number="+355 69 123 4567", organisation=self.organisation, agent=self.agent),
+            Lead(first_name="Ardit", last_name="Kola", email="ardit@example.com",
+                 phone_number="0681112222", organisation=self.organisation),
+        ])
+        other = User.objects.create_user(username="org2", password="pass12345")
+        Lead.objects.create(first_name="Arta", last_name="Meta", email="arta@example.com",
+                            phone_number="069", organisation=other.userprofile)
+
+    def names(self, q, **params):
+        response = self.client.get(reverse("leads:lead-autocomplete"), {"q": q, **params})
+        return [result["name"] for result in response.json()["results"]]
+
+    def test_prefix_matches_are_scoped_to_organisation(self):
+        self.assertEqual(self.names("ar"), ["Arbën Hoxha", "Ardit Kola"])
+        self.assertEqual(self.names("ARBE"), ["Arbën Hoxha"])
+        self.assertEqual(self.names("hox"), ["Arbën Hoxha"])
+        self.assertEqual(self.names("ardit@"), ["Ardit Kola"])
+        self.assertEqual(self.names("355 69"), ["Arbën Hoxha"])
+        self.assertEqual(self.names("ar", limit="1"), ["Arbën Hoxha"])
+
+    def test_agent_sees_only_own_leads(self):
+        self.client.login(username="agent", password="pass12345")
+        self.assertEqual(self.names("ar"), ["Arbën Hoxha"])
+
+    def test_repeated_prefix_is_served_from_lru_until_leads_change(self):
+        self.names("ar")
+        with self.assertNumQueries(3):  # sesioni, user-i, profili
+            self.assertEqual(self.names("ar"), ["Arbën Hoxha", "Ardit Kola"])
+
+        lead = Lead.objects.get(first_name="Ardit")
+        lead.first_name = "Besnik"
+        lead.save()
+        # "ar" ende përputhet me email-in, por me emrin e ri
+        self.assertEqual(self.names("ar"), ["Arbën Hoxha", "Besnik Kola"])
+        self.assertEqual(self.names("ardit k"), [])
+        self.assertEqual(self.names("besn"), ["Besnik Kola"])
+
+
+class PrefixCacheTest(LeadTestCase):
+
+    def test_evicts_least_recently_used(self):
+        lru = PrefixCache(size=2, organisations=2)
+        lru.set(1, "a", "v1", ["A"])
+        lru.set(1, "b", "v1", ["B"])
+        lru.get(1, "a", "v1")
+        lru.set(1, "c", "v1", ["C"])
+        self.assertIsNone(lru.get(1, "b", "v1"))
+        self.assertEqual(lru.get(1, "a", "v1"), ["A"])
+        self.assertIsNone(lru.get(1, "a", "v2"))  # versioni i ri e bën të vjetër
+
+        lru.set(2, "a", "v1", ["A2"])
+        lru.set(3, "a", "v1", ["A3"])
+        self.assertIsNone(lru.get(1, "c", "v1"))
@@ -0,0 +1,75 @@
+from django.shortcuts import reverse
+
+from leads.models import Category, FollowUp, Lead, Notification, User
+from .base import LeadTestCase
+
+
+class ConditionalGetTest(LeadTestCase):
+
+    def revalidate(self, url, response, **extra):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"], **extra)
+
+    def test_feed_returns_304_until_a_notification_arrives(self):
+        url = reverse("leads:notifications-feed") + "?since=2020-01-01T00:00:00Z"
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("no-cache", first["Cache-Control"])
+
+        # session, user dhe një query me gjendjen e njoftimeve
+        with self.assertNumQueries(3):
+            self.assertEqual(self.revalidate(url, first).status_code, 304)
+
+        Notification.objects.create(user=self.organisor, message="E re")
+        response = self.revalidate(url, first)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 1)
+
+    def test_feed_sees_writes_from_other_processes(self):
+        # bulk_create/update() nuk lëshojnë sinjale, si njoftimet e një worker-i tjetër
+        url = reverse("leads:notifications-feed")
+        first = self.client.get(url)
+        Notification.objects.bulk_create([Notification(user=self.organisor, message="Nga worker-i")])
+        second = self.revalidate(url, first)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()["count"], 1)
+
+        Notification.objects.update(read=True)
+        self.assertEqual(self.revalidate(url, second).status_code, 200)
+
+    def test_lead_detail_is_revalidated_with_one_lookup(self):
+        self.create_leads(1)
+        lead = Lead.objects.get()
+        url = reverse("leads:lead-detail", kwargs={"pk": lead.pk})
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        # badge-i i njoftimeve ndryshon pa lënë kohë në DB, ndaj vetëm ETag
+        self.assertFalse(first.has_header("Last-Modified"))
+
+        with self.assertNumQueries(3):   # session, user, lead + njoftimet + kategoritë
+            self.assertEqual(self.revalidate(url, first).status_code, 304)
+
+    def test_lead_detail_changes_invalidate_the_etag(self):
+        self.create_leads(1)
+        lead = Lead.objects.get()
+        url = reverse("leads:lead-detail", kwargs={"pk": lead.pk})
+
+        for change in (
+            lambda: FollowUp.objects.create(lead=lead, agent=self.organisor, notes="Telefonatë"),
+            lambda: Lead.objects.get().save(update_fields=["age"]),
+            lambda: Category.objects.create(name="Contacted", organisation=self.organisation),
+        ):
+            first = self.client.get(url)
+            change()
+            self.assertEqual(self.revalidate(url, first).status_code, 200)
+
+        # leximi i njoftimit ndryshon vetëm badge-in, pa asnjë kohë të re
+        Notification.objects.create(user=self.organisor, message="Lead i ri")
+        first = self.client.get(url)
+        Notification.objects.update(read=True)
+        self.assertEqual(self.revalidate(url, first).status_code, 200)
+
+    def test_other_organisations_lead_is_still_404(self):
+        self.create_leads(1)
+        url = reverse("leads:lead-detail", kwargs={"pk": Lead.objects.get().pk})
+        self.client.force_login(User.objects.create_user(username="tjeter", password="pass12345"))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH="*").status_code, 404)
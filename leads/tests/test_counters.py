@@ -0,0 +1,84 @@
+from django.core.management import call_command
+from django.db import connection
+from django.shortcuts import reverse
+from django.test.utils import CaptureQueriesContext
+
+from leads.importing import bulk_insert_leads
+from leads.models import Agent, Category, Lead, User, UserProfile
+from .base import LeadTestCase
+
+
+class LeadCounterTest(LeadTestCase):
+
+    def setUp(self):
+        super().setUp()
+        other_user = User.objects.create_user(
+            username="agent2", password="pass12345", is_organisor=False, is_agent=True
+        )
+        self.other_agent = Agent.objects.create(user=other_user, organisation=self.organisation)
+        self.other_category = Category.objects.create(name="Contacted", organisation=self.organisation)
+
+    def assertCounts(self, organisation, agent, other_agent, category, other_category):
+        self.assertEqual(
+            (
+                UserProfile.objects.get(pk=self.organisation.pk).lead_count,
+                Agent.objects.get(pk=self.agent.pk).lead_count,
+                Agent.objects.get(pk=self.other_agent.pk).lead_count,
+                Category.objects.get(pk=self.category.pk).lead_count,
+                Category.objects.get(pk=self.other_category.pk).lead_count,
+            ),
+            (organisation, agent, other_agent, category, other_category),
+        )
+
+    def test_create_reassign_recategorise_delete(self):
+        self.create_leads(3)
+        self.assertCounts(3, 3, 0, 3, 0)
+
+        lead = Lead.objects.first()
+        lead.agent = self.other_agent
+        lead.category = self.other_category
+        lead.save()
+        self.assertCounts(3, 2, 1, 2, 1)
+
+        # ruajtje pa ndryshime nuk prek numëruesit
+        lead.save()
+        self.assertCounts(3, 2, 1, 2, 1)
+
+        Lead.objects.filter(pk=lead.pk).delete()
+        self.assertCounts(2, 2, 0, 2, 0)
+
+    def test_bulk_assign_view(self):
+        leads = [
+            Lead.objects.create(first_name=f"L{i}", last_name="T", organisation=self.organisation,
+                                phone_number="069", email=f"l{i}@example.com")
+            for i in range(3)
+        ]
+        self.client.post(reverse("leads:assign-multiple-agents"), {
+            "lead_ids": [lead.pk for lead in leads[:2]],
+            "agent_id": self.other_agent.pk,
+        })
+        self.assertCounts(3, 0, 2, 0, 0)
+
+    def test_bulk_insert_and_recount(self):
+        bulk_insert_leads([
+            Lead(first_name=f"L{i}", last_name="T", organisation=self.organisation,
+                 agent=self.agent, category=self.category, phone_number="069",
+                 email=f"l{i}@example.com")
+            for i in range(4)
+        ])
+        self.assertCounts(4, 4, 0, 4, 0)
+
+        Lead.objects.filter(pk__in=Lead.objects.values("pk")[:1]).update(agent=self.other_agent)
+        Category.objects.filter(pk=self.other_category.pk).update(lead_count=7)
+        call_command("recount_leads", stdout=None)
+        self.assertCounts(4, 3, 1, 4, 0)
+
+    def test_category_list_uses_counters(self):
+        self.create_leads(2)
+        Lead.objects.create(first_name="Pa", last_name="Kategori", organisation=self.organisation,
+                            phone_number="069", email="pa@example.com")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("leads:category-list"))
+        self.assertFalse([q for q in queries if '"leads_lead"' in q["sql"]])
+        self.assertEqual(response.context["unassigned_lead_count"], 1)
+        self.assertContains(response, '<td class="px-4 py-3">2</td>', html=True)
@@ -0,0 +1,80 @@
+from django.core.management import call_command
+from django.shortcuts import reverse
+from django.test import SimpleTestCase
+
+from leads import dedup
+from leads.blocking import email_key, name_key, soundex
+from leads.importing import bulk_insert_leads
+from leads.models import DuplicateCandidate, FollowUp, Lead, User
+from .base import LeadTestCase
+
+
+class BlockingKeyTest(SimpleTestCase):
+
+    def test_keys(self):
+        self.assertEqual(soundex("Robert"), soundex("Rupert"))
+        self.assertEqual(soundex("Tymczak"), "t522")
+        self.assertEqual(name_key("Arbën", "Hoxha"), name_key("Arben", "Hoxa"))
+        self.assertEqual(email_key("A.Hoxha+crm@GoogleMail.com"), "ahoxha@gmail.com")
+        self.assertEqual(email_key("Ana@Example.com"), "ana@example.com")
+
+
+class DuplicateDetectionTest(LeadTestCase):
+
+    def make(self, first, last, email, phone, **kwargs):
+        return Lead(first_name=first, last_name=last, email=email, phone_number=phone,
+                    organisation=self.organisation, **kwargs)
+
+    def test_insert_flags_matches_with_older_leads(self):
+        original = self.make("Arbën", "Hoxha", "arben@example.com", "0691234567")
+        original.save()
+        copy = self.make("Arben", "Hoxa", "Arben@Example.com", "+355 69 123 4567")
+        copy.save()
+        self.make("Gent", "Lika", "gent@example.com", "0680000000").save()
+
+        candidate = DuplicateCandidate.objects.get()
+        self.assertEqual((candidate.lead, candidate.duplicate_of), (copy, original))
+        self.assertEqual((candidate.reasons, candidate.score), ("email,phone,name", 1.4))
+
+    def test_bulk_insert_flags_duplicates_within_batch(self):
+        bulk_insert_leads([
+            self.make("Ana", "Dema", "ana@example.com", "0691111111"),
+            self.make("Anila", "Dema", "ana@example.com", "0692222222"),
+        ])
+        self.assertEqual(DuplicateCandidate.objects.get().reasons, "email")
+
+    def test_public_form_resubmission_updates_existing_lead(self):
+        admin = User.objects.create_user(username="admin", password="pass12345")
+        lead = Lead.objects.create(first_name="Ana", last_name="Dema", email="ana@example.com",
+                                   phone_number="0691111111", organisation=admin.userprofile)
+        self.client.logout()
+        self.client.post(reverse("leads:register-lead"), {
+            "first_name": "Ana", "last_name": "Dema", "email": "ANA@example.com",
+            "phone_number": "+355691111111", "age": "30", "service": "Konsulencë",
+        })
+        call_command("process_lead_submissions", stdout=None)
+        self.assertEqual(Lead.objects.filter(organisation=admin.userprofile).count(), 1)
+        lead.refresh_from_db()
+        self.assertEqual((lead.age, lead.service), (30, "Konsulencë"))
+        self.assertIn("Konsulencë", FollowUp.objects.get(lead=lead).notes)
+
+    def test_merge_moves_followups_and_deletes_duplicate(self):
+        self.create_leads(1)
+        primary = Lead.objects.get()
+        duplicate = self.make("Lead0", "Test", "lead0@example.com", "0691234567", service="Web")
+        duplicate.save()
+        FollowUp.objects.create(lead=duplicate, agent=self.organisor, notes="nga dublikata")
+
+        dedup.merge(primary, duplicate)
+        self.assertEqual(Lead.objects.count(), 1)
+        self.assertEqual(primary.followups.count(), 2)
+        self.assertEqual(Lead.objects.get().service, "Web")
+
+    def test_batch_command_pairs_each_lead_with_oldest_of_block(self):
+        leads = [self.make(f"L{i}", "T", "same@example.com", f"06900000{i}") for i in range(4)]
+        Lead.objects.bulk_create(leads)   # pa çelësa dhe pa flamurë
+        call_command("find_duplicate_leads", stdout=None)
+
+        oldest = Lead.objects.order_by("id").first()
+        pairs = DuplicateCandidate.objects.values_list("duplicate_of", flat=True)
+        self.assertEqual(list(pairs), [oldest.pk] * 3)
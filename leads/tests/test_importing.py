@@ -0,0 +1,55 @@
+import io
+import tempfile
+
+from django.core.management import call_command
+
+from leads.models import Lead, Notification
+from .base import LeadTestCase
+
+
+CSV = """first_name,last_name,age,email,phone_number
+Arben,Hoxha,30,ARBEN@example.com,+355 69 123 4567
+Blerina,Shehu,,blerina@example.com,
+Dritan,Kola,abc,dritan@example.com,
+Elira,Basha,41,elira@example.com,069-222-3333
+Fatos,Lika,25,fatos@example.com,
+Gent,Meta,33,nuk-eshte-email,
+"""
+
+
+class CreateLeadsCommandTest(LeadTestCase):
+
+    def import_csv(self, content, **options):
+        self.organisor.email = "org@example.com"
+        self.organisor.save()
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="utf-8") as csv_file:
+            csv_file.write(content)
+            csv_file.flush()
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command("create_leads", csv_file.name, "org@example.com",
+                         stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_imports_valid_rows_in_batches(self):
+        Notification.objects.all().delete()
+        stdout, stderr = self.import_csv(CSV, batch_size=2)
+
+        leads = Lead.objects.filter(organisation=self.organisation).order_by("id")
+        self.assertEqual(
+            [(lead.first_name, lead.age, lead.email, lead.phone_number) for lead in leads],
+            [
+                ("Arben", 30, "arben@example.com", "+355691234567"),
+                ("Blerina", 0, "blerina@example.com", ""),
+                ("Elira", 41, "elira@example.com", "0692223333"),
+                ("Fatos", 25, "fatos@example.com", ""),
+            ],
+        )
+        self.assertIn("Rreshti 4: mosha e pavlefshme", stderr)
+        self.assertIn("Rreshti 7: email i pavlefshëm", stderr)
+        self.assertIn("U importuan 4 leads", stdout)
+
+        # një njoftim përmbledhës në vend të një njoftimi për çdo lead
+        self.assertEqual(
+            list(Notification.objects.values_list("message", flat=True)),
+            ["U importuan 4 leads nga CSV"],
+        )
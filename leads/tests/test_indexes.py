@@ -0,0 +1,86 @@
+import datetime
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from leads.models import Lead, Notification
+from leads.stats import get_dashboard_stats
+from leads.views import visible_leads
+from .base import LeadTestCase
+
+
+class QueryPlanTest(LeadTestCase):
+    """
+    Query-t kryesore duhet të përdorin indekset e Meta.indexes, jo full scan.
+    Planet kontrollohen vetëm në DB-në ku xhirojnë testet (këtu SQLite); renditja
+    e kolonave në indekset e përbëra në Postgres verifikohet vetëm kur testet
+    xhirohen me Postgres.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.create_leads(3)
+        if connection.vendor == "postgresql":
+            # me tabela të vogla Postgres zgjedh gjithmonë seq scan
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset, *index_names):
+        plan = queryset.explain()
+        self.assertTrue(
+            any(name in plan for name in index_names),
+            f"Asnjë nga {index_names} në planin:\n{plan}",
+        )
+
+    def test_lead_list(self):
+        for params, index in (
+            ("", "lead_org_date_idx"),
+            ("sort=first_asc", "lead_org_first_name_idx"),
+            (f"agent={self.agent.pk}", "lead_org_agent_date_idx"),
+            (f"category={self.category.pk}", "lead_org_cat_date_idx"),
+        ):
+            with self.subTest(params=params):
+                queryset = visible_leads(self.organisor, QueryDict(params)).with_list_data()
+                self.assertUsesIndex(queryset[:10], index, "lead_org_agent_date_idx")
+
+        # faqja e agjentit
+        queryset = visible_leads(self.agent.user, QueryDict()).with_list_data()
+        self.assertUsesIndex(queryset[:10], "lead_org_agent_date_idx")
+
+    def test_last_followup_subquery(self):
+        plan = Lead.objects.with_list_data().explain()
+        self.assertIn("followup_lead_date_idx", plan)
+
+    def test_dashboard(self):
+        # aggregate() nuk ka explain(): merret SQL-i që ekzekuton vetë dashboard-i
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            get_dashboard_stats(self.organisation.pk)
+        self.assertEqual(len(queries), 1)
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {queries[0]['sql']}")
+            plan = "\n".join(" ".join(map(str, row)) for row in cursor.fetchall())
+        # vetëm rreshtat e organizatës, me cilindo indeks që fillon me organisation
+        self.assertTrue(
+            any(name in plan for name in ("lead_org_", "leads_lead_organisation_id")),
+            f"Pa indeks organizate në planin:\n{plan}",
+        )
+
+    def test_notification_feed(self):
+        unread = Notification.objects.filter(user=self.organisor, read=False).order_by("-created_at")
+        self.assertUsesIndex(unread[:10], "notif_user_read_created_idx", "notif_user_created_idx")
+
+        since = timezone.now() - datetime.timedelta(minutes=1)
+        recent = Notification.objects.filter(user=self.organisor, created_at__gt=since).order_by("-created_at")
+        self.assertUsesIndex(recent[:10], "notif_user_created_idx")
+
+    def test_notification_pruning(self):
+        cutoff = timezone.now() - datetime.timedelta(days=30)
+        old_read = Notification.objects.filter(read=True, created_at__lt=cutoff).order_by("created_at")
+        self.assertUsesIndex(old_read[:1000], "notif_read_created_idx")
+
+    def test_unread_count_for_metrics(self):
+        self.assertUsesIndex(Notification.objects.filter(read=False), "notif_unread_user_idx")
@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.shortcuts import reverse
+from django.test.utils import CaptureQueriesContext
+
+from leads.ingestion import TARGET_CACHE_KEY, process_submissions
+from leads.models import Category, Lead, LeadSubmission, Notification, User
+from .base import LeadTestCase
+
+
+class PublicFormIngestionTest(LeadTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(username="admin", password="pass12345")
+        self.client.logout()
+
+    def submit(self, i, **extra):
+        return self.client.post(reverse("leads:register-lead"), {
+            "first_name": f"Ana{i}", "last_name": "Dema", "email": f"ana{i}@example.com",
+            "phone_number": f"06911111{i:02d}", "age": "30", **extra,
+        })
+
+    def test_form_only_queues_the_submission(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.submit(1, service="Web")
+        writes = [q["sql"] for q in queries if not q["sql"].startswith("SELECT")]
+        self.assertEqual(len(writes), 1)
+        self.assertIn("leads_leadsubmission", writes[0])
+        self.assertRedirects(response, reverse("leads:thank-you"))
+        self.assertFalse(Lead.objects.exists())
+
+    def test_invalid_submission_is_not_queued(self):
+        self.client.post(reverse("leads:register-lead"), {"first_name": "Ana", "email": "jo"})
+        self.assertFalse(LeadSubmission.objects.exists())
+
+    def test_worker_creates_leads_in_bulk(self):
+        for i in range(5):
+            self.submit(i)
+        self.submit(0, service="Web")   # e njëjta person dy herë në batch
+
+        self.assertEqual(process_submissions(), (5, 1))
+        leads = Lead.objects.filter(organisation=self.admin.userprofile)
+        self.assertEqual(leads.count(), 5)
+        self.assertEqual(leads.get(first_name="Ana0").service, "Web")
+        self.assertEqual(set(leads.values_list("category__name", flat=True)), {"New"})
+        self.assertFalse(LeadSubmission.objects.exists())
+        self.assertEqual(Notification.objects.filter(user=self.admin).count(), 1)
+        self.admin.userprofile.refresh_from_db()
+        self.assertEqual(self.admin.userprofile.lead_count, 5)
+
+    def test_target_ids_are_cached(self):
+        self.submit(1)
+        call_command("process_lead_submissions", stdout=None)
+        self.assertIsNotNone(cache.get(TARGET_CACHE_KEY))
+
+        self.submit(2)
+        with CaptureQueriesContext(connection) as queries:
+            process_submissions()
+        # pa SELECT për admin-in, agjentin dhe kategorinë
+        selects = [q["sql"] for q in queries if q["sql"].startswith("SELECT")]
+        self.assertFalse(any("leads_category" in sql or "leads_user" in sql for sql in selects))
+
+        Category.objects.filter(organisation=self.admin.userprofile).delete()
+        self.assertIsNone(cache.get(TARGET_CACHE_KEY))
@@ -0,0 +1,37 @@
+from django.shortcuts import reverse
+from django.test import override_settings
+
+from .base import LeadTestCase
+
+
+class QueryBudgetMiddlewareTest(LeadTestCase):
+
+    def timing(self, response):
+        return dict(
+            part.strip().split(";", 1) for part in response["Server-Timing"].split(",")
+        )
+
+    def test_server_timing_reports_queries(self):
+        self.create_leads(3)
+        response = self.client.get(reverse("leads:lead-list"))
+        timing = self.timing(response)
+        self.assertIn("queries", timing["db"])
+        self.assertTrue(timing["total"].startswith("dur="))
+
+    def test_views_stay_within_their_budgets(self):
+        # me 20 leads një N+1 do ta kalonte buxhetin menjëherë
+        self.create_leads(20)
+        lead = self.organisation.lead_set.first()
+        for name, kwargs in (
+            ("leads:lead-list", {}),
+            ("leads:lead-detail", {"pk": lead.pk}),
+            ("leads:category-list", {}),
+        ):
+            with self.subTest(view=name), self.assertNoLogs("leads.instrumentation", "WARNING"):
+                self.assertEqual(self.client.get(reverse(name, kwargs=kwargs)).status_code, 200)
+
+    @override_settings(QUERY_BUDGETS={"leads:lead-list": 1})
+    def test_exceeded_budget_is_logged(self):
+        with self.assertLogs("leads.instrumentation", "WARNING") as logs:
+            self.client.get(reverse("leads:lead-list"))
+        self.assertIn("view=leads:lead-list", logs.output[0])
@@ -0,0 +1,91 @@
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.shortcuts import reverse
+from django.test import override_settings
+
+from leads.mail import MAX_ATTEMPTS, deliver_queued_mail, queue_mail
+from leads.models import OutgoingEmail
+from .base import LeadTestCase
+
+
+class CountingBackend(EmailBackend):
+    connections = 0
+
+    def open(self):
+        CountingBackend.connections += 1
+        return super().open()
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionRefusedError("SMTP nuk përgjigjet")
+
+
+class UnreachableBackend(EmailBackend):
+
+    def open(self):
+        raise OSError("host i panjohur")
+
+
+class OutboxTest(LeadTestCase):
+
+    def test_lead_create_queues_mail_instead_of_sending(self):
+        response = self.client.post(reverse("leads:lead-create"), {
+            "first_name": "Ana", "last_name": "Dema", "age": 30,
+            "agent": self.agent.pk, "phone_number": "069", "email": "ana@example.com",
+        })
+        self.assertRedirects(response, reverse("leads:lead-list"))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutgoingEmail.objects.get().subject, "A lead has been created")
+
+        call_command("send_queued_mail", stdout=None)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(OutgoingEmail.objects.get().status, OutgoingEmail.SENT)
+
+    def test_password_reset_goes_through_outbox(self):
+        self.organisor.email = "org@example.com"
+        self.organisor.save()
+        self.client.logout()
+        self.client.post(reverse("password_reset"), {"email": "org@example.com"})
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutgoingEmail.objects.get().to, ["org@example.com"])
+
+    @override_settings(OUTBOX_EMAIL_BACKEND="leads.tests.test_mail.CountingBackend")
+    def test_batch_uses_one_connection(self):
+        for i in range(3):
+            queue_mail(f"Email {i}", "Tekst", [f"user{i}@example.com"])
+        CountingBackend.connections = 0
+        self.assertEqual(deliver_queued_mail(batch_size=10), (3, 0))
+        self.assertEqual(CountingBackend.connections, 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    @override_settings(OUTBOX_EMAIL_BACKEND="leads.tests.test_mail.FailingBackend")
+    def test_failures_are_retried_with_backoff(self):
+        email = queue_mail("Email", "Tekst", ["user@example.com"])
+        self.assertEqual(deliver_queued_mail(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutgoingEmail.PENDING, 1))
+        self.assertIn("SMTP nuk përgjigjet", email.last_error)
+        # nuk riprovohet para se të kalojë backoff-i
+        self.assertEqual(deliver_queued_mail(), (0, 0))
+
+        OutgoingEmail.objects.update(attempts=MAX_ATTEMPTS - 1, next_attempt_at=email.created_at)
+        deliver_queued_mail()
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.FAILED)
+
+    @override_settings(OUTBOX_EMAIL_BACKEND="leads.tests.test_mail.UnreachableBackend")
+    def test_connection_failure_backs_off_the_whole_batch(self):
+        for i in range(2):
+            queue_mail(f"Email {i}", "Tekst", [f"user{i}@example.com"])
+        self.assertEqual(deliver_queued_mail(), (0, 2))
+        for email in OutgoingEmail.objects.all():
+            self.assertEqual((email.status, email.attempts), (OutgoingEmail.PENDING, 1))
+            self.assertIn("host i panjohur", email.last_error)
+            self.assertGreater(email.next_attempt_at, email.created_at)
+
+        OutgoingEmail.objects.update(attempts=MAX_ATTEMPTS - 1, next_attempt_at=email.created_at)
+        deliver_queued_mail()
+        self.assertFalse(OutgoingEmail.objects.exclude(status=OutgoingEmail.FAILED).exists())
@@ -0,0 +1,56 @@
+from django.shortcuts import reverse
+from django.test import override_settings
+from prometheus_client import REGISTRY
+
+from leads.importing import bulk_insert_leads
+from leads.models import Lead, Notification
+from .base import LeadTestCase
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTest(LeadTestCase):
+
+    def test_lead_creation_is_counted_by_source(self):
+        ui = sample("crm_leads_created_total", source="ui")
+        imported = sample("crm_leads_created_total", source="csv_import")
+        self.create_leads(2)
+        bulk_insert_leads([Lead(first_name="A", last_name="B", organisation=self.organisation)])
+        self.assertEqual(sample("crm_leads_created_total", source="ui") - ui, 2)
+        self.assertEqual(sample("crm_leads_created_total", source="csv_import") - imported, 1)
+
+    def test_assignments_and_view_latency(self):
+        self.create_leads(1)
+        lead = Lead.objects.get()
+        lead.agent = None
+        assignments = sample("crm_lead_assignments_total")
+        lead.save()
+        self.assertEqual(sample("crm_lead_assignments_total") - assignments, 1)
+
+        requests = sample("crm_request_duration_seconds_count", view="leads:lead-list")
+        self.client.get(reverse("leads:lead-list"))
+        self.assertEqual(sample("crm_request_duration_seconds_count", view="leads:lead-list") - requests, 1)
+
+    @override_settings(METRICS_ALLOWED_IPS=["127.0.0.0/8"])
+    def test_endpoint_exposes_backlog(self):
+        Notification.objects.create(user=self.organisor, message="x")
+        body = self.client.get("/metrics").content.decode()
+        self.assertIn("crm_notifications_unread 1.0", body)
+        self.assertIn("crm_leads_created_total", body)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN=None, METRICS_ALLOWED_IPS=["10.0.0.0/8"])
+    def test_closed_without_token_except_for_allowed_addresses(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="10.1.2.3").status_code, 200)
+        # X-Forwarded-For nuk merret parasysh
+        self.assertEqual(self.client.get("/metrics", HTTP_X_FORWARDED_FOR="10.1.2.3").status_code, 403)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get("/metrics").status_code, 200)
@@ -0,0 +1,219 @@
+import asyncio
+import datetime
+import io
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.db import connection
+from django.shortcuts import reverse
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from leads import notifications
+from leads.models import Lead, Notification, NotificationArchive
+from leads.notifications import get_summary, user_channel
+from leads.pubsub import InProcessBroker, get_broker
+from .base import LeadTestCase
+
+
+class NotificationSummaryTest(LeadTestCase):
+
+    def notify(self, count):
+        for i in range(count):
+            Notification.objects.create(user=self.organisor, message=f"Njoftim {i}")
+
+    def test_summary_is_cached_until_notifications_change(self):
+        self.notify(7)
+        with self.assertNumQueries(1):
+            summary = get_summary(self.organisor)
+        self.assertEqual(summary["unread_count"], 7)
+        self.assertEqual(len(summary["items"]), 5)
+        with self.assertNumQueries(0):
+            get_summary(self.organisor)
+
+        Notification.objects.create(user=self.organisor, message="Tjetër")
+        summary = get_summary(self.organisor)
+        self.assertEqual(summary["unread_count"], 8)
+        self.assertEqual(summary["items"][0]["message"], "Tjetër")
+
+    def test_mark_read_invalidates_summary(self):
+        self.notify(2)
+        self.assertEqual(get_summary(self.organisor)["unread_count"], 2)
+        self.client.post(reverse("leads:notifications-mark-read"), {"all": "true"})
+        self.assertEqual(get_summary(self.organisor)["unread_count"], 0)
+
+    def test_navbar_shows_unread_count(self):
+        self.notify(3)
+        response = self.client.get(reverse("leads:category-list"))
+        self.assertEqual(response.context["unread_count"], 3)
+        self.assertContains(response, 'id="notificationCount"')
+
+
+class NotificationBrokerTest(LeadTestCase):
+
+    def test_subscription_receives_messages_from_other_threads(self):
+        broker = InProcessBroker()
+        subscription = broker.subscribe("user:1")
+        threading.Timer(0.05, broker.publish, args=("user:1", {"id": 1})).start()
+        self.assertEqual(subscription.get(timeout=2), {"id": 1})
+        self.assertIsNone(subscription.get(timeout=0.01))
+
+        async def receive():
+            threading.Timer(0.05, broker.publish, args=("user:1", {"id": 2})).start()
+            return await subscription.aget(timeout=2)
+
+        self.assertEqual(asyncio.run(receive()), {"id": 2})
+        subscription.close()
+        broker.publish("user:1", {"id": 3})
+        self.assertIsNone(subscription.get(timeout=0.01))
+
+    def test_new_notification_is_published_after_commit(self):
+        subscription = get_broker().subscribe(f"user:{self.organisor.pk}")
+        self.addCleanup(subscription.close)
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(user=self.organisor, message="Live")
+        self.assertEqual(subscription.get(timeout=1)["message"], "Live")
+
+
+class NotificationStreamTest(LeadTestCase):
+
+    def test_wsgi_request_gets_no_content(self):
+        response = self.client.get(reverse("leads:notifications-stream"))
+        self.assertEqual(response.status_code, 204)
+
+    async def test_stream_pushes_published_notifications(self):
+        await self.async_client.aforce_login(self.organisor)
+        response = await self.async_client.get(reverse("leads:notifications-stream"))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = aiter(response.streaming_content)
+        self.assertEqual(await anext(events), b"retry: 5000\n\n")
+
+        pending = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0.05)
+        get_broker().publish(f"user:{self.organisor.pk}", {"id": 7, "message": "Lead i ri"})
+        chunk = await asyncio.wait_for(pending, 2)
+        self.assertIn(b"event: notification", chunk)
+        self.assertIn(b'"Lead i ri"', chunk)
+        await response.streaming_content.aclose()
+
+
+class NotificationBatchTest(LeadTestCase):
+
+    def test_batch_flushes_with_one_insert(self):
+        with CaptureQueriesContext(connection) as queries, notifications.batch():
+            for i in range(5):
+                notifications.notify(self.organisor.pk, f"Njoftim {i}")
+            self.assertEqual(len(queries), 0)
+        self.assertEqual(sum(q["sql"].startswith("INSERT") for q in queries), 1)
+        self.assertEqual(Notification.objects.count(), 5)
+
+    def test_new_leads_coalesce_per_recipient_within_window(self):
+        self.create_leads(3)
+        notification = Notification.objects.get()
+        self.assertEqual((notification.kind, notification.count), (notifications.NEW_LEADS, 3))
+        self.assertEqual(notification.message, "3 leads të reja")
+
+        # `since=` e kthen sërish me të njëjtin id, që navbar-i ta zëvendësojë
+        since = notification.created_at.isoformat()
+        self.create_leads(1)
+        items = self.client.get(reverse("leads:notifications-feed"), {"since": since}).json()["items"]
+        self.assertEqual([(item["id"], item["message"]) for item in items],
+                         [(notification.id, "4 leads të reja")])
+
+        # një njoftim i lexuar, ose jashtë dritares, nuk rihapet
+        notification.read = True
+        notification.save()
+        self.create_leads(1)
+        self.assertEqual(Notification.objects.filter(read=False).get().count, 1)
+        with override_settings(NOTIFICATION_COALESCE_WINDOW=0):
+            notifications.notify_new_leads(self.organisor.pk, list(Lead.objects.all()[:2]))
+        self.assertEqual(Notification.objects.filter(read=False).count(), 2)
+
+    def test_bulk_assignment_notifies_without_extra_queries(self):
+        self.create_leads(4)
+        lead_ids = list(Lead.objects.values_list("id", flat=True))
+        for chunk in (lead_ids[:2], lead_ids[2:]):
+            self.client.post(reverse("leads:assign-multiple-agents"), {
+                "lead_ids": chunk, "agent_id": self.agent.pk,
+            })
+        notification = Notification.objects.get(user=self.agent.user)
+        self.assertEqual(notification.message, "U caktuan 4 leads tek ju")
+
+
+class NotificationPruneTest(LeadTestCase):
+
+    def test_only_old_read_notifications_are_removed(self):
+        old = timezone.now() - datetime.timedelta(days=40)
+        for i in range(5):
+            Notification.objects.create(user=self.organisor, message=f"Lexuar {i}", read=True)
+        Notification.objects.create(user=self.organisor, message="Palexuar")
+        Notification.objects.create(user=self.organisor, message="E re", read=True)
+        Notification.objects.exclude(message="E re").update(created_at=old)
+
+        out = io.StringIO()
+        call_command("prune_notifications", "--archive", "--batch-size", "2", stdout=out)
+        self.assertIn("5 njoftime", out.getvalue())
+        self.assertEqual(
+            set(Notification.objects.values_list("message", flat=True)), {"Palexuar", "E re"}
+        )
+        archived = NotificationArchive.objects.order_by("message")
+        self.assertEqual(archived.count(), 5)
+        self.assertEqual(archived[0].created_at, old)
+
+    def test_pruning_invalidates_the_cached_summary(self):
+        Notification.objects.create(user=self.organisor, message="Lexuar", read=True)
+        Notification.objects.update(created_at=timezone.now() - datetime.timedelta(days=40))
+        get_summary(self.organisor)
+        key = notifications.summary_cache_key(self.organisor.pk)
+        self.assertIsNotNone(cache.get(key))
+
+        notifications.prune_read(datetime.timedelta(days=30))
+        self.assertIsNone(cache.get(key))
+
+
+class NotificationLongPollTest(LeadTestCase):
+
+    def setUp(self):
+        super().setUp()
+        Notification.objects.create(user=self.organisor, message="E vjetër")
+        self.url = reverse("leads:notifications-feed") + "?since=2020-01-01T00:00:00Z"
+
+    async def poll(self, wait, publish_after=None):
+        # long-poll vetëm nën ASGI: async_client ndërton ASGIRequest
+        await self.async_client.aforce_login(self.organisor)
+        etag = (await self.async_client.get(self.url))["ETag"]
+        if publish_after is not None:
+            threading.Timer(publish_after, get_broker().publish, (user_channel(self.organisor.pk), {"id": 0})).start()
+        started = time.monotonic()
+        response = await self.async_client.get(f"{self.url}&wait={wait}", headers={"If-None-Match": etag})
+        return response, time.monotonic() - started
+
+    async def test_returns_304_after_the_timeout(self):
+        response, elapsed = await self.poll(0.3)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["X-Poll-Wait"], "0.3")
+        self.assertGreaterEqual(elapsed, 0.3)
+
+    async def test_published_notification_wakes_the_request(self):
+        response, elapsed = await self.poll(10, publish_after=0.2)
+        # rillogaritet menjëherë; pa njoftim të ri në DB mbetet 304
+        self.assertEqual(response.status_code, 304)
+        self.assertLess(elapsed, 5)
+
+    def test_wsgi_ignores_wait(self):
+        etag = self.client.get(self.url)["ETag"]
+        started = time.monotonic()
+        response = self.client.get(f"{self.url}&wait=10", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["X-Poll-Wait"], "0")
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_asgi_middleware_chain_is_fully_async(self):
+        # një middleware vetëm-sync do ta kalonte gjithë zinxhirin nga sync_to_async,
+        # dhe long-poll-i do të zinte një thread për kërkesë
+        with self.assertNoLogs("django.request", "DEBUG"):
+            ASGIHandler()
@@ -0,0 +1,55 @@
+from django.core.management import call_command
+from django.shortcuts import reverse
+from django.test import SimpleTestCase
+
+from leads.models import Lead
+from leads.phones import next_prefix, normalize
+from .base import LeadTestCase
+
+
+class NormalizeTest(SimpleTestCase):
+
+    def test_formats_of_the_same_number(self):
+        for raw in ("+355 69 123 4567", "00355691234567", "069-123-4567", "69 123 4567"):
+            self.assertEqual(normalize(raw), "355691234567", raw)
+        self.assertEqual(normalize("+39 06 1234 5678"), "390612345678")
+        self.assertEqual(normalize("n/a"), "")
+
+    def test_next_prefix(self):
+        self.assertEqual(next_prefix("7654"), "7655")
+        self.assertEqual(next_prefix("7659"), "766")
+        self.assertIsNone(next_prefix("99"))
+
+
+class PhoneSearchTest(LeadTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.lead = Lead.objects.create(
+            first_name="Arben", last_name="Hoxha", email="arben@example.com",
+            phone_number="069 123 4567", organisation=self.organisation, agent=self.agent,
+        )
+
+    def search(self, q):
+        response = self.client.get(reverse("leads:lead-list"), {"q": q})
+        return [lead.pk for lead in response.context["leads"]]
+
+    def test_saved_number_is_normalised(self):
+        self.assertEqual((self.lead.phone_digits, self.lead.phone_digits_rev),
+                         ("355691234567", "765432196553"))
+        self.lead.phone_number = "+355 68 000 1111"
+        self.lead.save(update_fields=["phone_number"])
+        self.lead.refresh_from_db()
+        self.assertEqual(self.lead.phone_digits, "355680001111")
+
+    def test_any_format_finds_the_lead(self):
+        for q in ("+355 69 123 4567", "0691234567", "1234567", "123 4567"):
+            self.assertEqual(self.search(q), [self.lead.pk], q)
+        self.assertEqual(self.search("4567"), [])            # prapashtesë shumë e shkurtër
+        self.assertEqual(self.search(str(self.lead.pk)), [self.lead.pk])
+
+    def test_backfill_command(self):
+        Lead.objects.filter(pk=self.lead.pk).update(phone_digits="", phone_digits_rev="")
+        call_command("backfill_phone_digits", stdout=None)
+        self.lead.refresh_from_db()
+        self.assertEqual(self.lead.phone_digits, "355691234567")
@@ -0,0 +1,62 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.shortcuts import reverse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from leads.models import LeadSubmission, User
+from leads.ratelimit import MemoryStore, RateLimiter, get_counts
+from .base import LeadTestCase
+
+
+class TokenBucketTest(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.limiter = RateLimiter("test", {"ip": (2, 10), "global": (3, 30)}, MemoryStore())
+        self.factory = RequestFactory()
+
+    def check(self, ip, at):
+        with mock.patch("leads.ratelimit.time.time", return_value=at):
+            return self.limiter.check(self.factory.post("/", REMOTE_ADDR=ip))
+
+    def test_burst_then_refill(self):
+        self.assertEqual([self.check("1.1.1.1", 0) for _ in range(2)], [0, 0])
+        self.assertAlmostEqual(self.check("1.1.1.1", 0), 5.0)
+        # 5 sekonda = një token për kovën e IP-së
+        self.assertEqual(self.check("1.1.1.1", 5), 0)
+
+    def test_global_bucket_is_shared_between_ips(self):
+        for ip in ("1.1.1.1", "2.2.2.2", "3.3.3.3"):
+            self.assertEqual(self.check(ip, 0), 0)
+        self.assertGreater(self.check("4.4.4.4", 0), 0)
+        self.assertEqual(get_counts("test"), {"accepted": 3, "rejected": 1})
+
+    def test_global_rejection_does_not_spend_the_ip_token(self):
+        self.limiter = RateLimiter("test", {"ip": (2, 100), "global": (3, 30)}, MemoryStore())
+        for ip in ("1.1.1.1", "2.2.2.2", "3.3.3.3"):
+            self.check(ip, 0)
+        # refuzimet nga kova globale nuk prekin kovën e IP-së (që rimbushet ngadalë)
+        self.assertAlmostEqual(self.check("4.4.4.4", 0), 10.0)
+        self.assertAlmostEqual(self.check("4.4.4.4", 0), 10.0)
+        self.assertEqual(self.check("4.4.4.4", 10), 0)
+
+
+@override_settings(RATE_LIMITS={"public-lead": {"ip": (2, 60)}})
+class PublicFormRateLimitTest(LeadTestCase):
+
+    def test_requests_over_the_limit_are_rejected_without_queries(self):
+        User.objects.create_user(username="admin", password="pass12345")
+        self.client.logout()
+        data = {"first_name": "Ana", "last_name": "Dema", "email": "ana@example.com", "age": "30"}
+        for _ in range(2):
+            self.client.post(reverse("leads:register-lead"), data)
+
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse("leads:register-lead"), data)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+        self.assertEqual(LeadSubmission.objects.count(), 2)
+        self.assertEqual(get_counts("public-lead"), {"accepted": 2, "rejected": 1})
+        # faqja e formës nuk kufizohet
+        self.assertEqual(self.client.get(reverse("leads:register-lead")).status_code, 200)
@@ -0,0 +1,59 @@
+from django.shortcuts import reverse
+
+from leads.importing import bulk_insert_leads
+from leads.models import Lead
+from leads.search import search_leads
+from .base import LeadTestCase
+
+
+class LeadSearchTest(LeadTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.lead = lambda first, last, email: Lead(
+            first_name=first, last_name=last, email=email, phone_number="069",
+            organisation=self.organisation, agent=self.agent,
+        )
+
+    def found(self, query):
+        return set(search_leads(Lead.objects.all(), query).values_list("first_name", flat=True))
+
+    def test_index_follows_inserts_updates_and_deletes(self):
+        bulk_insert_leads([
+            self.lead("Arbën", "Hoxha", "arben@example.com"),
+            self.lead("Blerina", "Shehu", "blerina@shembull.al"),
+        ])
+        lead = Lead.objects.create(first_name="Dritan", last_name="Kola",
+                                   email="dritan@example.com", organisation=self.organisation)
+
+        self.assertEqual(self.found("arben"), {"Arbën"})      # pa diakritikë
+        self.assertEqual(self.found("shemb"), {"Blerina"})    # prefiks në email
+        self.assertEqual(self.found("example"), {"Arbën", "Dritan"})
+        self.assertEqual(self.found("dritan kol"), {"Dritan"})
+
+        Lead.objects.filter(pk=lead.pk).update(last_name="Meta")
+        self.assertEqual(self.found("kola"), set())
+        self.assertEqual(self.found("meta"), {"Dritan"})
+
+        lead.delete()
+        self.assertEqual(self.found("dritan"), set())
+
+    def test_list_view_sorts_by_relevance(self):
+        bulk_insert_leads([
+            self.lead("Ana", "Dema", "x@example.com"),
+            self.lead("Besa", "Ana", "ana@example.com"),
+            self.lead("Gent", "Lika", "gent@example.com"),
+        ])
+        response = self.client.get(reverse("leads:lead-list"), {"q": "ana", "sort": "relevance"})
+        names = [lead.first_name for lead in response.context["leads"]]
+        self.assertEqual(names, ["Besa", "Ana"])
+
+        # relevanca funksionon edhe me faqosjen keyset
+        response = self.client.get(reverse("leads:lead-list"), {
+            "q": "ana", "sort": "relevance", "pagination": "keyset", "perpage": 1,
+        })
+        self.assertEqual([lead.first_name for lead in response.context["leads"]], ["Besa"])
+        response = self.client.get(reverse("leads:lead-list"), {
+            "q": "ana", "sort": "relevance", "cursor": response.context["page_obj"].next_cursor, "perpage": 1,
+        })
+        self.assertEqual([lead.first_name for lead in response.context["leads"]], ["Ana"])
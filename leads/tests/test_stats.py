@@ -0,0 +1,61 @@
+import datetime
+
+from django.db import connection
+from django.shortcuts import reverse
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from leads.models import Category, Lead, User
+from .base import LeadTestCase
+
+
+class DashboardStatsTest(LeadTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.converted = Category.objects.create(name="Converted", organisation=self.organisation)
+        # një organizatë tjetër me kategorinë e vet "Converted"
+        other = User.objects.create_user(username="org2", password="pass12345")
+        Category.objects.create(name="Converted", organisation=other.userprofile)
+
+    def lead_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("dashboard"))
+        return response, [q for q in queries if '"leads_lead"' in q["sql"]]
+
+    def test_counts_in_one_query_then_from_cache(self):
+        self.create_leads(3)
+        old = Lead.objects.first()
+        Lead.objects.filter(pk=old.pk).update(date_added=timezone.now() - datetime.timedelta(days=40))
+        Lead.objects.filter(pk=Lead.objects.last().pk).update(
+            category=self.converted, converted_date=timezone.now()
+        )
+
+        response, queries = self.lead_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.context["total_lead_count"], 3)
+        self.assertEqual(response.context["total_in_past30"], 2)
+        self.assertEqual(response.context["converted_in_past30"], 1)
+
+        response, queries = self.lead_queries()
+        self.assertEqual(queries, [])
+
+    def test_cache_invalidated_when_leads_change(self):
+        self.create_leads(1)
+        self.lead_queries()
+        self.create_leads(1)
+        response, queries = self.lead_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.context["total_lead_count"], 2)
+
+    def test_category_update_sets_converted_date(self):
+        self.create_leads(1)
+        lead = Lead.objects.get()
+        self.client.post(reverse("leads:lead-category-update", args=[lead.pk]), {
+            "category": self.converted.pk,
+        })
+        lead.refresh_from_db()
+        self.assertEqual(lead.category, self.converted)
+        self.assertIsNotNone(lead.converted_date)
+        response, _ = self.lead_queries()
+        self.assertEqual(response.context["converted_in_past30"], 1)
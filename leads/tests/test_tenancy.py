@@ -0,0 +1,69 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from leads.models import User, Lead, Agent, Category
+from leads.tenancy import get_tenant
+
+from .base import LeadTestCase
+
+
+class TenantTest(LeadTestCase):
+    def test_resolves_organisor_and_agent(self):
+        tenant = get_tenant(self.organisor)
+        self.assertTrue(tenant.is_organisor)
+        self.assertEqual(tenant.organisation_id, self.organisation.pk)
+        self.assertIsNone(tenant.agent_id)
+
+        tenant = get_tenant(self.agent.user)
+        self.assertFalse(tenant.is_organisor)
+        self.assertEqual((tenant.organisation_id, tenant.agent_id), (self.organisation.pk, self.agent.pk))
+
+    def test_resolved_once_per_user(self):
+        with self.assertNumQueries(1):
+            get_tenant(self.agent.user)
+            get_tenant(self.agent.user)
+
+    def test_user_without_organisation_sees_nothing(self):
+        self.create_leads(1)
+        user = User.objects.create_user(username="loose", password="pass12345", is_organisor=False)
+        self.assertFalse(get_tenant(user))
+        self.assertFalse(Lead.objects.for_user(user).exists())
+        self.assertFalse(Category.objects.for_user(user).exists())
+
+    def test_for_user_scopes_agent_to_own_leads(self):
+        self.create_leads(2)
+        other_user = User.objects.create_user(username="agent2", password="pass12345", is_organisor=False)
+        other = Agent.objects.create(user=other_user, organisation=self.organisation)
+        Lead.objects.create(first_name="A", last_name="B", organisation=self.organisation, agent=other)
+        outsider = User.objects.create_user(username="org2", password="pass12345")
+        Lead.objects.create(first_name="C", last_name="D", organisation=outsider.userprofile)
+
+        self.assertEqual(Lead.objects.for_user(self.organisor).count(), 3)
+        self.assertEqual(Lead.objects.for_user(self.agent.user).count(), 2)
+        self.assertEqual(Lead.objects.for_org(outsider.userprofile).count(), 1)
+        self.assertEqual(Agent.objects.for_user(other_user).count(), 2)
+
+    def test_lead_list_looks_up_organisation_once(self):
+        self.create_leads(3)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("leads:lead-list"))
+        self.assertEqual(response.status_code, 200)
+        lookups = [q["sql"] for q in ctx.captured_queries if 'FROM "leads_userprofile"' in q["sql"]]
+        self.assertEqual(len(lookups), 1)
+        # filtrat e organizatës janë me id, pa join te profili
+        self.assertFalse(any('JOIN "leads_userprofile"' in q["sql"] for q in ctx.captured_queries))
+
+    def test_agent_cannot_bulk_reassign(self):
+        self.create_leads(2)
+        other_user = User.objects.create_user(username="agent2", password="pass12345", is_organisor=False)
+        other = Agent.objects.create(user=other_user, organisation=self.organisation)
+        self.client.login(username="agent", password="pass12345")
+
+        response = self.client.post(reverse("leads:assign-multiple-agents"), {
+            "lead_ids": list(Lead.objects.values_list("pk", flat=True)),
+            "agent_id": other.pk,
+        })
+        self.assertRedirects(response, reverse("leads:lead-list"), fetch_redirect_response=False)
+        self.assertEqual(Lead.objects.filter(agent=self.agent).count(), 2)
+        self.assertFalse(Lead.objects.filter(agent=other).exists())
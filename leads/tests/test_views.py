@@ -1,10 +1,174 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.shortcuts import reverse
 
+from leads.filters import get_ordering
+from leads.models import User, Lead, FollowUp
+from .base import LeadTestCase
+
 
 class LandingPageTest(TestCase):
 
     def test_get(self):
         response = self.client.get(reverse("landing-page"))
         self.assertEqual(response.status_code, 200)
-        self.assertTemplateUsed(response, "landing.html")
\ No newline at end of file
+        self.assertTemplateUsed(response, "landing.html")
+
+
+class LeadListViewTest(LeadTestCase):
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("leads:lead-list"), {"perpage": "50"})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.create_leads(2)
+        few = self.count_queries()
+        self.create_leads(15)
+        many = self.count_queries()
+        self.assertEqual(few, many)
+
+    def test_last_comment_is_latest_followup(self):
+        self.create_leads(1)
+        lead = Lead.objects.get()
+        FollowUp.objects.create(lead=lead, agent=self.organisor, notes="Më i fundit")
+        response = self.client.get(reverse("leads:lead-list"))
+        self.assertContains(response, "Më i fundit")
+
+
+class LeadNavigationTest(LeadTestCase):
+
+    def test_next_and_prev_follow_list_filters(self):
+        self.create_leads(3)
+        Lead.objects.create(
+            first_name="Tjeter", last_name="Test", organisation=self.organisation,
+            agent=self.agent, phone_number="1", email="tjeter@example.com",
+        )
+        self.client.get(reverse("leads:lead-list"), {"category": self.category.pk, "sort": "first_asc"})
+        self.assertNotIn("visible_leads", self.client.session)
+
+        lead0, lead1, lead2 = Lead.objects.filter(category=self.category).order_by("first_name")
+        response = self.client.get(reverse("leads:lead-next", args=[lead0.pk]))
+        self.assertRedirects(response, reverse("leads:lead-detail", args=[lead1.pk]))
+        response = self.client.get(reverse("leads:lead-prev", args=[lead1.pk]))
+        self.assertRedirects(response, reverse("leads:lead-detail", args=[lead0.pk]))
+
+        # në fund të listës rikthehet tek i pari, dhe anasjelltas
+        response = self.client.get(reverse("leads:lead-next", args=[lead2.pk]))
+        self.assertRedirects(response, reverse("leads:lead-detail", args=[lead0.pk]))
+        response = self.client.get(reverse("leads:lead-prev", args=[lead0.pk]))
+        self.assertRedirects(response, reverse("leads:lead-detail", args=[lead2.pk]))
+
+    def test_lead_outside_filters_goes_back_to_list(self):
+        self.create_leads(1)
+        other = Lead.objects.create(
+            first_name="Tjeter", last_name="Test", organisation=self.organisation,
+            agent=self.agent, phone_number="1", email="tjeter@example.com",
+        )
+        self.client.get(reverse("leads:lead-list"), {"category": self.category.pk})
+        response = self.client.get(reverse("leads:lead-next", args=[other.pk]))
+        self.assertRedirects(response, reverse("leads:lead-list"))
+
+
+class LeadKeysetPaginationTest(LeadTestCase):
+
+    def walk(self, params):
+        seen, cursor = [], None
+        while True:
+            query = dict(params, pagination="keyset", perpage="2")
+            if cursor:
+                query["cursor"] = cursor
+            page = self.client.get(reverse("leads:lead-list"), query).context["page_obj"]
+            seen.extend(lead.pk for lead in page)
+            if not page.has_next():
+                return seen, page
+            cursor = page.next_cursor
+
+    def test_walks_every_lead_once_in_sort_order(self):
+        self.create_leads(5)
+        for sort in ("date_desc", "first_asc"):
+            seen, last_page = self.walk({"sort": sort})
+            expected = list(Lead.objects.order_by(*get_ordering({"sort": sort})).values_list("pk", flat=True))
+            self.assertEqual(seen, expected)
+
+            # Previous nga faqja e fundit kthen faqen e mëparshme
+            previous = self.client.get(reverse("leads:lead-list"), {
+                "sort": sort, "pagination": "keyset", "perpage": "2",
+                "cursor": last_page.previous_cursor,
+            }).context["page_obj"]
+            self.assertEqual([lead.pk for lead in previous], expected[2:4])
+
+    def test_ajax_returns_table_body(self):
+        self.create_leads(3)
+        response = self.client.get(reverse("leads:lead-list"), {
+            "ajax": "1", "pagination": "keyset", "perpage": "2",
+        })
+        self.assertTemplateUsed(response, "leads/_leads_table_body.html")
+        self.assertContains(response, 'data-next-cursor="' + response.context["page_obj"].next_cursor)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        self.create_leads(1)
+        response = self.client.get(reverse("leads:lead-list"), {"cursor": "nuk-eshte-cursor"})
+        self.assertEqual(len(response.context["page_obj"]), 1)
+
+
+class LeadJsonViewTest(LeadTestCase):
+
+    def get_json(self, **params):
+        response = self.client.get(reverse("leads:lead-list-json"), params)
+        return response, b"".join(response.streaming_content)
+
+    def test_streams_only_own_organisation(self):
+        self.create_leads(3)
+        other = User.objects.create_user(username="other", password="pass12345")
+        Lead.objects.create(first_name="Huaj", last_name="X", organisation=other.userprofile,
+                            phone_number="1", email="huaj@example.com")
+
+        response, body = self.get_json()
+        data = json.loads(body)
+        self.assertEqual([row["first_name"] for row in data["qs"]], ["Lead0", "Lead1", "Lead2"])
+        self.assertEqual(set(data["qs"][0]), {"first_name", "last_name", "age"})
+        self.assertIsNone(data["next_cursor"])
+
+    def test_ndjson_with_fields_and_cursor(self):
+        self.create_leads(5)
+        response, body = self.get_json(format="ndjson", fields="id,email", limit=2)
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(set(rows[0]), {"id", "email"})
+
+        seen = [row["id"] for row in rows]
+        cursor = response["X-Next-Cursor"]
+        while cursor:
+            response, body = self.get_json(format="ndjson", fields="id", limit=2, after=cursor)
+            seen += [json.loads(line)["id"] for line in body.splitlines()]
+            cursor = response.get("X-Next-Cursor")
+        self.assertEqual(seen, list(Lead.objects.order_by("id").values_list("id", flat=True)))
+
+    def test_full_last_page_has_no_cursor(self):
+        self.create_leads(4)
+        with CaptureQueriesContext(connection) as ctx:
+            response, body = self.get_json(limit=4)
+        self.assertEqual(len(json.loads(body)["qs"]), 4)
+        self.assertIsNone(json.loads(body)["next_cursor"])
+        self.assertFalse(response.has_header("X-Next-Cursor"))
+        # faqja dhe cursor-i nga i njëjti query
+        self.assertEqual(sum('FROM "leads_lead"' in q["sql"] for q in ctx.captured_queries), 1)
+
+    async def test_asgi_export_streams_asynchronously(self):
+        await sync_to_async(self.create_leads)(3)
+        await self.async_client.aforce_login(self.organisor)
+        response = await self.async_client.get(reverse("leads:lead-list-json"), {"format": "ndjson"})
+        self.assertTrue(response.is_async)
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(body.splitlines()), 3)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse("leads:lead-list-json"), {"fields": "password"})
+        self.assertEqual(response.status_code, 400)
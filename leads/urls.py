@@ -4,7 +4,9 @@ from .views import (
     LeadListView, LeadDetailView, LeadCreateView, LeadUpdateView, LeadDeleteView,
     AssignAgentView, CategoryListView, CategoryDetailView, LeadCategoryUpdateView,
     CategoryCreateView, CategoryUpdateView, CategoryDeleteView, LeadJsonView, 
-    FollowUpCreateView, FollowUpUpdateView, FollowUpDeleteView,  AssignMultipleAgentsView, PublicLeadCreateView,ThankYouView, lead_prev, lead_next,notifications_feed, notifications_mark_read
+    FollowUpCreateView, FollowUpUpdateView, FollowUpDeleteView,  AssignMultipleAgentsView, PublicLeadCreateView,ThankYouView, lead_prev, lead_next,notifications_feed, notifications_mark_read,
+    notifications_stream,
+    lead_autocomplete
 )
 
 
@@ -13,6 +15,7 @@ app_name = "leads"
 urlpatterns = [
     path('', LeadListView.as_view(), name='lead-list'),
     path('json/', LeadJsonView.as_view(), name='lead-list-json'),
+    path('autocomplete/', lead_autocomplete, name='lead-autocomplete'),
     path('<int:pk>/', LeadDetailView.as_view(), name='lead-detail'),
     path('<int:pk>/update/', LeadUpdateView.as_view(), name='lead-update'),
     path('<int:pk>/delete/', LeadDeleteView.as_view(), name='lead-delete'),
@@ -34,4 +37,5 @@ urlpatterns = [
     path("<int:pk>/next/", lead_next, name="lead-next"),
     path("notifications/feed/", notifications_feed, name="notifications-feed"),
     path("notifications/mark-read/", notifications_mark_read, name="notifications-mark-read"),
+    path("notifications/stream/", notifications_stream, name="notifications-stream"),
 ]
\ No newline at end of file
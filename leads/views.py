@@ -1,27 +1,38 @@
-import logging
 import datetime
+import json
+import logging
+import math
+
+from asgiref.sync import sync_to_async
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.mail import send_mail
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.http import HttpResponseForbidden, JsonResponse
+from django.http import (
+    HttpResponse, HttpResponseForbidden, JsonResponse, QueryDict, StreamingHttpResponse
+)
 from django.http.response import JsonResponse
 from django.middleware.csrf import get_token
 from django.shortcuts import (
     render, redirect, get_object_or_404
 )
 from django.urls import reverse
-from django.utils.dateparse import parse_datetime
-from django.utils.timezone import now
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.decorators import method_decorator
+from django.utils.timezone import localdate, now
 from django.views import generic, View
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.http import condition, require_GET, require_POST
+from prometheus_client import CONTENT_TYPE_LATEST
 
 from agents.mixins import OrganisorAndLoginRequiredMixin
 from .forms import (
@@ -33,7 +44,20 @@ from .forms import (
     CategoryModelForm,
     FollowUpModelForm
 )
-from .models import Lead, Agent, Category, FollowUp, Notification
+from . import counters, metrics, notifications
+from .analytics import conversion_report
+from .autocomplete import autocomplete
+from .conditional import feed_etag, lead_etag
+from .filters import filter_leads, get_ordering
+from .importing import clean_row
+from .ingestion import enqueue_submission
+from .mail import queue_mail
+from .models import Lead, Agent, Category, FollowUp, Notification, UserProfile
+from .notifications import invalidate_summary, serialize as serialize_notification, user_channel
+from .pagination import KeysetPaginator, seek, row_values
+from .pubsub import get_broker
+from .ratelimit import get_limiter
+from .stats import get_dashboard_stats, is_converted
 
 
 logger = logging.getLogger(__name__)
@@ -72,40 +96,55 @@ class DashboardView(OrganisorAndLoginRequiredMixin, generic.TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super(DashboardView, self).get_context_data(**kwargs)
+        # total, 30 ditët e fundit, të konvertuar në 30 ditë
+        context.update(get_dashboard_stats(self.request.tenant.organisation_id))
+        return context
 
-        user = self.request.user
-
-        # How many leads we have in total
-        total_lead_count = Lead.objects.filter(organisation=user.userprofile).count()
 
-        # How many new leads in the last 30 days
-        thirty_days_ago = datetime.date.today() - datetime.timedelta(days=30)
+class DashboardStatsView(OrganisorAndLoginRequiredMixin, generic.View):
+    """
+    Funnel-i i konvertimeve dhe trendi për agjent në ?start=&end= (YYYY-MM-DD),
+    nga rollup-i ditor; parazgjedhur 30 ditët e fundit.
+    """
+    DEFAULT_DAYS = 30
 
-        total_in_past30 = Lead.objects.filter(
-            organisation=user.userprofile,
-            date_added__gte=thirty_days_ago
-        ).count()
+    def get(self, request, *args, **kwargs):
+        today = localdate()
+        try:
+            end = parse_date(request.GET.get("end", "")) or today
+            start = parse_date(request.GET.get("start", "")) or end - datetime.timedelta(days=self.DEFAULT_DAYS - 1)
+        except ValueError:
+            return JsonResponse({"error": "Datë e pavlefshme"}, status=400)
+        if start > end:
+            return JsonResponse({"error": "start duhet të jetë para end"}, status=400)
+        return JsonResponse(conversion_report(request.tenant.organisation_id, start, end))
 
-        # How many converted leads in the last 30 days
-        converted_category = Category.objects.get(name="Converted")
-        converted_in_past30 = Lead.objects.filter(
-            organisation=user.userprofile,
-            category=converted_category,
-            converted_date__gte=thirty_days_ago
-        ).count()
 
-        context.update({
-            "total_lead_count": total_lead_count,
-            "total_in_past30": total_in_past30,
-            "converted_in_past30": converted_in_past30
-        })
-        return context
+@require_GET
+def metrics_view(request):
+    """Metrikat për Prometheus; shih metrics.authorized për kush i lexon."""
+    if not metrics.authorized(request):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type=CONTENT_TYPE_LATEST)
 
 
 def landing_page(request):
     return render(request, "landing.html")
 
 
+def visible_leads(user, params):
+    """
+    Leads që përdoruesi sheh në listë, të filtruara dhe të renditura
+    sipas `params` (request.GET ose querystring-u i ruajtur në sesion).
+    """
+    queryset = Lead.objects.for_user(user)
+    if user.is_organisor:
+        queryset = queryset.filter(agent__isnull=False)
+
+    queryset = filter_leads(queryset, params)
+    return queryset.order_by(*get_ordering(params))
+
+
 class LeadListView(LoginRequiredMixin, generic.ListView):
     template_name = "leads/lead_list.html"
     context_object_name = "leads"
@@ -118,95 +157,52 @@ class LeadListView(LoginRequiredMixin, generic.ListView):
         return self.paginate_by
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_organisor:
-            queryset = Lead.objects.filter(
-                organisation=user.userprofile,
-                agent__isnull=False
-            )
-        elif hasattr(user, "agent"):  # kontrollojmë nëse ka agent
-            queryset = Lead.objects.filter(
-                organisation=user.agent.organisation,
-                agent__isnull=False
-            ).filter(agent__user=user)
-        else:
-            return Lead.objects.none()
-
-        # --- Filtrimet ---
-        q = self.request.GET.get("q")
-        agent = self.request.GET.get("agent")
-        category = self.request.GET.get("category")
-
-        if q:
-            if q.isdigit():
-                queryset = queryset.filter(
-                     Q(id=int(q)) |               # vetëm ID exakte
-            Q(phone_number=q)            # vetëm numri exakte
-                )
-            else:
-                queryset = queryset.filter(
-                    Q(first_name__icontains=q) |
-                    Q(last_name__icontains=q) |
-                    Q(email__icontains=q)
-                )
-
-        if agent:
-            queryset = queryset.filter(agent__id=agent)
-        if category:
-            queryset = queryset.filter(category__id=category)
-
-        # --- Renditja ---
-        sort = self.request.GET.get("sort")
-        if sort == "date_asc":
-            queryset = queryset.order_by("date_added")   # më i vjetri në fillim
-        elif sort == "date_desc":
-            queryset = queryset.order_by("-date_added")  # më i riu në fillim
-        elif sort == "first_asc":
-            queryset = queryset.order_by("first_name")
-        elif sort == "first_desc":
-            queryset = queryset.order_by("-first_name")
-        else:
-            # DEFAULT → më të rinjtë në fillim
-            queryset = queryset.order_by("-date_added")
+        return visible_leads(self.request.user, self.request.GET).with_list_data()
 
-        return queryset
+    def get_template_names(self):
+        # ?ajax=1 → vetëm tbody-ja e tabelës
+        if self.request.GET.get("ajax"):
+            return ["leads/_leads_table_body.html"]
+        return super().get_template_names()
+
+    def uses_keyset_pagination(self):
+        mode = self.request.GET.get("pagination") or getattr(settings, "LEAD_LIST_PAGINATION", "offset")
+        return mode == "keyset" or "cursor" in self.request.GET
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.uses_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+
+        ordering = get_ordering(self.request.GET)
+        paginator = KeysetPaginator(queryset, page_size, ordering)
+        page = paginator.get_page(self.request.GET.get("cursor"))
+        return (paginator, page, page.object_list, page.has_other_pages())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
+        tenant = self.request.tenant
 
-        if user.is_organisor:
-            context["unassigned_leads"] = Lead.objects.filter(
-                organisation=user.userprofile,
+        if tenant.is_organisor:
+            context["unassigned_leads"] = Lead.objects.for_org(tenant.organisation_id).filter(
                 agent__isnull=True
             )
-            context["agents"] = Agent.objects.filter(
-                organisation=user.userprofile
-            )
-            context["categories"] = Category.objects.filter(
-                organisation=user.userprofile
-            )
-        elif hasattr(user, "agent"):
-            context["agents"] = Agent.objects.filter(
-                organisation=user.agent.organisation
-            )
-            context["categories"] = Category.objects.filter(
-                organisation=user.agent.organisation
-            )
-        else:
-            context["agents"] = Agent.objects.none()
-            context["categories"] = Category.objects.none()
-
-        context["unread_notifications"] = user.notifications.filter(read=False)
-        context["unread_count"] = context["unread_notifications"].count()
-
-        # Ruaj id-të sipas filtrave, sort-it dhe faqes aktuale
-        queryset = self.get_queryset()
-        lead_ids = list(queryset.values_list("id", flat=True))
-        self.request.session["visible_leads"] = lead_ids
+        context["agents"] = Agent.objects.for_user(user).select_related("user")
+        context["categories"] = Category.objects.for_user(user)
+
+        if self.uses_keyset_pagination():
+            # querystring pa cursor/page për linket Next/Previous
+            params = self.request.GET.copy()
+            params.pop("cursor", None)
+            params.pop("page", None)
+            params.pop("ajax", None)
+            params["pagination"] = "keyset"
+            context["keyset_query"] = params.urlencode()
 
         # Ruaj querystring që të rikthehesh me back button
-        self.request.session["last_leads_query"] = self.request.GET.urlencode()
+        # (përdoret edhe nga lead_prev/lead_next për të rindërtuar filtrat)
+        if not self.request.GET.get("ajax"):
+            self.request.session["last_leads_query"] = self.request.GET.urlencode()
 
         return context
 
@@ -215,7 +211,7 @@ class LeadListView(LoginRequiredMixin, generic.ListView):
 
 
 def lead_list(request):
-    leads = Lead.objects.all()
+    leads = Lead.objects.with_list_data()
 
     sort = request.GET.get("sort")
     if sort == "date_asc":
@@ -236,18 +232,14 @@ def lead_list(request):
 
 
 
+@method_decorator(cache_control(private=True, no_cache=True), name="get")
+@method_decorator(condition(etag_func=lead_etag), name="get")
 class LeadDetailView(LoginRequiredMixin, generic.DetailView):
     template_name = "leads/lead_detail.html"
     context_object_name = "lead"
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_organisor:
-            queryset = Lead.objects.filter(organisation=user.userprofile)
-        else:
-            queryset = Lead.objects.filter(organisation=user.agent.organisation)
-            queryset = queryset.filter(agent__user=user)
-        return queryset
+        return Lead.objects.for_user(self.request.user)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -274,9 +266,9 @@ class LeadCreateView(OrganisorAndLoginRequiredMixin, generic.CreateView):
 
     def form_valid(self, form):
         lead = form.save(commit=False)
-        lead.organisation = self.request.user.userprofile
+        lead.organisation_id = self.request.tenant.organisation_id
         lead.save()
-        send_mail(
+        queue_mail(
             subject="A lead has been created",
             message="Go to the site to see the new lead",
             from_email="test@test.com",
@@ -304,9 +296,8 @@ class LeadUpdateView(OrganisorAndLoginRequiredMixin, generic.UpdateView):
     form_class = LeadModelForm
 
     def get_queryset(self):
-        user = self.request.user
         # initial queryset of leads for the entire organisation
-        return Lead.objects.filter(organisation=user.userprofile)
+        return Lead.objects.for_org(self.request.tenant.organisation_id)
 
     def get_success_url(self):
         return reverse("leads:lead-list")
@@ -339,9 +330,8 @@ class LeadDeleteView(OrganisorAndLoginRequiredMixin, generic.DeleteView):
         return reverse("leads:lead-list")
 
     def get_queryset(self):
-        user = self.request.user
         # initial queryset of leads for the entire organisation
-        return Lead.objects.filter(organisation=user.userprofile)
+        return Lead.objects.for_org(self.request.tenant.organisation_id)
 
 
 def lead_delete(request, pk):
@@ -378,34 +368,23 @@ class CategoryListView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super(CategoryListView, self).get_context_data(**kwargs)
-        user = self.request.user
-
-        if user.is_organisor:
-            queryset = Lead.objects.filter(
-                organisation=user.userprofile
-            )
-        else:
-            queryset = Lead.objects.filter(
-                organisation=user.agent.organisation
-            )
-
+        organisation_lead_count = (
+            UserProfile.objects
+            .filter(pk=self.request.tenant.organisation_id)
+            .values_list("lead_count", flat=True)
+            .first()
+        ) or 0
+
+        # nga numëruesit, pa numëruar mbi tabelën e leads
+        categorised = sum(category.lead_count for category in context["category_list"])
         context.update({
-            "unassigned_lead_count": queryset.filter(category__isnull=True).count()
+            "unassigned_lead_count": organisation_lead_count - categorised
         })
         return context
 
     def get_queryset(self):
-        user = self.request.user
         # initial queryset of leads for the entire organisation
-        if user.is_organisor:
-            queryset = Category.objects.filter(
-                organisation=user.userprofile
-            )
-        else:
-            queryset = Category.objects.filter(
-                organisation=user.agent.organisation
-            )
-        return queryset
+        return Category.objects.for_user(self.request.user)
 
 
 class CategoryDetailView(LoginRequiredMixin, generic.DetailView):
@@ -413,17 +392,8 @@ class CategoryDetailView(LoginRequiredMixin, generic.DetailView):
     context_object_name = "category"
 
     def get_queryset(self):
-        user = self.request.user
         # initial queryset of leads for the entire organisation
-        if user.is_organisor:
-            queryset = Category.objects.filter(
-                organisation=user.userprofile
-            )
-        else:
-            queryset = Category.objects.filter(
-                organisation=user.agent.organisation
-            )
-        return queryset
+        return Category.objects.for_user(self.request.user)
 
 
 class CategoryCreateView(OrganisorAndLoginRequiredMixin, generic.CreateView):
@@ -435,7 +405,7 @@ class CategoryCreateView(OrganisorAndLoginRequiredMixin, generic.CreateView):
 
     def form_valid(self, form):
         category = form.save(commit=False)
-        category.organisation = self.request.user.userprofile
+        category.organisation_id = self.request.tenant.organisation_id
         category.save()
         return super(CategoryCreateView, self).form_valid(form)
 
@@ -448,17 +418,8 @@ class CategoryUpdateView(OrganisorAndLoginRequiredMixin, generic.UpdateView):
         return reverse("leads:category-list")
 
     def get_queryset(self):
-        user = self.request.user
         # initial queryset of leads for the entire organisation
-        if user.is_organisor:
-            queryset = Category.objects.filter(
-                organisation=user.userprofile
-            )
-        else:
-            queryset = Category.objects.filter(
-                organisation=user.agent.organisation
-            )
-        return queryset
+        return Category.objects.for_user(self.request.user)
 
 
 class CategoryDeleteView(OrganisorAndLoginRequiredMixin, generic.DeleteView):
@@ -468,17 +429,8 @@ class CategoryDeleteView(OrganisorAndLoginRequiredMixin, generic.DeleteView):
         return reverse("leads:category-list")
 
     def get_queryset(self):
-        user = self.request.user
         # initial queryset of leads for the entire organisation
-        if user.is_organisor:
-            queryset = Category.objects.filter(
-                organisation=user.userprofile
-            )
-        else:
-            queryset = Category.objects.filter(
-                organisation=user.agent.organisation
-            )
-        return queryset
+        return Category.objects.for_user(self.request.user)
 
 from django.contrib import messages
 
@@ -487,13 +439,7 @@ class LeadCategoryUpdateView(LoginRequiredMixin, generic.UpdateView):
     form_class = LeadCategoryUpdateForm
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_organisor:
-            queryset = Lead.objects.filter(organisation=user.userprofile)
-        else:
-            queryset = Lead.objects.filter(organisation=user.agent.organisation)
-            queryset = queryset.filter(agent__user=user)
-        return queryset
+        return Lead.objects.for_user(self.request.user)
 
     def get_success_url(self):
         return reverse("leads:lead-detail", kwargs={"pk": self.get_object().id})
@@ -501,10 +447,9 @@ class LeadCategoryUpdateView(LoginRequiredMixin, generic.UpdateView):
     def form_valid(self, form):
         lead_before_update = self.get_object()
         instance = form.save(commit=False)
-        converted_category = Category.objects.get(name="Converted")
-        if form.cleaned_data["category"] == converted_category:
-            if lead_before_update.category != converted_category:
-                instance.converted_date = datetime.datetime.now()
+        if is_converted(form.cleaned_data["category"]):
+            if not is_converted(lead_before_update.category):
+                instance.converted_date = now()
         instance.save()
         messages.success(self.request, "✅ Statusi i lead-it u ndryshua me sukses!")
         return super().form_valid(form)
@@ -539,12 +484,12 @@ class FollowUpUpdateView(LoginRequiredMixin, generic.UpdateView):
     form_class = FollowUpModelForm
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_organisor:
-            queryset = FollowUp.objects.filter(lead__organisation=user.userprofile)
-        else:
-            queryset = FollowUp.objects.filter(lead__organisation=user.agent.organisation)
-            queryset = queryset.filter(lead__agent__user=user)
+        tenant = self.request.tenant
+        if not tenant:
+            return FollowUp.objects.none()
+        queryset = FollowUp.objects.filter(lead__organisation_id=tenant.organisation_id)
+        if not tenant.is_organisor:
+            queryset = queryset.filter(lead__agent_id=tenant.agent_id)
         return queryset
 
     def get_success_url(self):
@@ -621,19 +566,94 @@ class FollowUpDeleteView(LoginRequiredMixin, generic.DeleteView):
 #     return render(request, "leads/lead_create.html", context)
 
 
-class LeadJsonView(generic.View):
+class LeadJsonView(LoginRequiredMixin, generic.View):
+    """
+    Eksport JSON i leads të organizatës, i transmetuar pa i mbajtur në memorie.
+      ?format=ndjson      një objekt JSON për rresht (përndryshe {"qs": [...]})
+      ?fields=id,email    vetëm këto fusha (shih JSON_FIELDS)
+      ?limit=N&after=ID   faqosje me cursor sipas id (N <= MAX_LIMIT); cursor-i tjetër
+                          vjen te "next_cursor" dhe te header-i X-Next-Cursor
+    """
+    JSON_FIELDS = (
+        "id", "first_name", "last_name", "age", "email", "phone_number",
+        "service", "agent_id", "category_id", "date_added", "converted_date",
+    )
+    DEFAULT_FIELDS = ("first_name", "last_name", "age")
+    CHUNK_SIZE = 2000
+    MAX_LIMIT = 10000  # faqja me ?limit= mbahet në memorie, ndaj ka kufi
+
+    def get_queryset(self):
+        return Lead.objects.for_user(self.request.user)
 
     def get(self, request, *args, **kwargs):
-        
-        qs = list(Lead.objects.all().values(
-            "first_name", 
-            "last_name", 
-            "age")
-        )
+        fields = [f for f in request.GET.get("fields", "").split(",") if f] or list(self.DEFAULT_FIELDS)
+        unknown = set(fields) - set(self.JSON_FIELDS)
+        if unknown:
+            return JsonResponse({"error": f"Fusha të panjohura: {', '.join(sorted(unknown))}"}, status=400)
+
+        queryset = self.get_queryset().order_by("id")
+        after = request.GET.get("after", "")
+        if after.isdigit():
+            queryset = queryset.filter(id__gt=int(after))
+
+        next_cursor = None
+        limit = request.GET.get("limit", "")
+        if limit.isdigit() and int(limit) > 0:
+            limit = min(int(limit), self.MAX_LIMIT)
+            # një rresht më shumë: nëse vjen, faqja tjetër ekziston dhe fillon pas të fundit tonë
+            page = list(queryset.values("id", *fields)[:limit + 1])
+            if len(page) > limit:
+                page = page[:limit]
+                next_cursor = page[-1]["id"]
+            if "id" not in fields:
+                for row in page:
+                    del row["id"]
+            rows = iter(page)
+        else:
+            rows = queryset.values(*fields).iterator(chunk_size=self.CHUNK_SIZE)
 
-        return JsonResponse({
-            "qs": qs,
-        })
+        if request.GET.get("format") == "ndjson":
+            chunks, content_type = ndjson_chunks(rows), "application/x-ndjson"
+        else:
+            chunks, content_type = json_chunks(rows, next_cursor), "application/json"
+        if isinstance(request, ASGIRequest):
+            # përndryshe Django e mbledh gjithë gjeneratorin sync me një list() para se ta dërgojë
+            chunks = async_chunks(chunks)
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        if next_cursor is not None:
+            response["X-Next-Cursor"] = str(next_cursor)
+        return response
+
+
+def ndjson_chunks(rows, rows_per_chunk=500):
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps(row, cls=DjangoJSONEncoder))
+        if len(buffer) >= rows_per_chunk:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+async def async_chunks(chunks):
+    """Chunk-et e një gjeneratori sync, secili i marrë me sync_to_async më vete."""
+    done = object()
+    while True:
+        # thread_sensitive: cursor-i i iterator()-it mbetet në të njëjtin thread/lidhje
+        chunk = await sync_to_async(next, thread_sensitive=True)(chunks, done)
+        if chunk is done:
+            return
+        yield chunk
+
+
+def json_chunks(rows, next_cursor):
+    yield '{"qs": ['
+    separator = ""
+    for chunk in ndjson_chunks(rows):
+        yield separator + ",".join(chunk.splitlines())
+        separator = ","
+    yield '], "next_cursor": ' + json.dumps(next_cursor) + "}"
     
 
 class AssignMultipleAgentsView(LoginRequiredMixin, generic.ListView):
@@ -641,24 +661,23 @@ class AssignMultipleAgentsView(LoginRequiredMixin, generic.ListView):
     context_object_name = "leads"
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_organisor:
-            return Lead.objects.filter(organisation=user.userprofile, agent__isnull=True)
-        else:
-            return Lead.objects.filter(organisation=user.agent.organisation, agent=user.agent)
+        queryset = Lead.objects.for_user(self.request.user)
+        if self.request.tenant.is_organisor:
+            queryset = queryset.filter(agent__isnull=True)
+        return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-        if user.is_organisor:
-            agents = Agent.objects.filter(organisation=user.userprofile)
-        else:
-            agents = Agent.objects.filter(organisation=user.agent.organisation)
-        context['agents'] = agents
+        context['agents'] = Agent.objects.for_user(self.request.user)
         return context
 
     def post(self, request, *args, **kwargs):
         user = request.user
+        # vetëm organizatori cakton leads; agjenti nuk i kalon leads e veta te të tjerët
+        if not request.tenant.is_organisor:
+            messages.error(request, "Vetëm organizatori mund të caktojë leads.")
+            return redirect('leads:lead-list')
+
         lead_ids = request.POST.getlist('lead_ids')
         agent_id = request.POST.get('agent_id')
 
@@ -671,22 +690,21 @@ class AssignMultipleAgentsView(LoginRequiredMixin, generic.ListView):
             return redirect('leads:lead-list')
 
         try:
-            agent = Agent.objects.get(id=agent_id, organisation=user.userprofile)
+            agent = Agent.objects.for_user(user).get(id=agent_id)
         except Agent.DoesNotExist:
             messages.error(request, "Agjenti i zgjedhur nuk ekziston.")
             return redirect('leads:lead-list')
 
-        leads = Lead.objects.filter(id__in=lead_ids, organisation=user.userprofile)
-        updated_count = leads.update(agent=agent)
+        leads = Lead.objects.for_user(user).filter(id__in=lead_ids)
+        updated_count = counters.update_leads(leads, agent=agent)
 
         if updated_count > 0 and agent.user:
-            sample_names = list(leads.values_list("first_name", flat=True)[:3])
-            names_str = ", ".join(sample_names)
-            extra = f" +{updated_count - 3} të tjerë" if updated_count > 3 else ""
-            Notification.objects.create(
-                user=agent.user,
-                message=f"U caktuan {updated_count} leads tek ju: {names_str}{extra}",
-                url=reverse("leads:lead-list"),
+            notifications.notify(
+                agent.user_id,
+                f"U caktuan {updated_count} leads tek ju",
+                reverse("leads:lead-list"),
+                kind=notifications.LEADS_ASSIGNED,
+                count=updated_count,
             )
 
         messages.success(request, f"{updated_count} leads janë caktuar te agjenti {agent.user.get_full_name()}.")
@@ -704,41 +722,27 @@ class PublicLeadCreateView(View):
     def get(self, request, *args, **kwargs):
         return render(request, self.template_name, {})  # gjithmonë jep context
 
+    def dispatch(self, request, *args, **kwargs):
+        # i vetmi shkrim pa login: kërkesat mbi kufi refuzohen para çdo query-je
+        if request.method == "POST":
+            retry_after = get_limiter("public-lead").check(request)
+            if retry_after:
+                response = HttpResponse("Shumë kërkesa, provo më vonë.", status=429)
+                response["Retry-After"] = str(math.ceil(retry_after))
+                return response
+        return super().dispatch(request, *args, **kwargs)
+
     def post(self, request, *args, **kwargs):
-        first_name = request.POST.get("first_name")
-        last_name = request.POST.get("last_name")
-        email = request.POST.get("email")
-        phone_number = request.POST.get("phone_number")
-        age = request.POST.get("age")
-        service = request.POST.get("service")
-
-        if not (first_name and last_name and email):
-            messages.error(request, "Plotëso të gjitha fushat e kërkuara.")
+        # vetëm validim + një INSERT; lead-i krijohet nga `process_lead_submissions`
+        try:
+            data = clean_row(request.POST)
+        except ValidationError as e:
+            for error in e.messages:
+                messages.error(request, error)
             return render(request, self.template_name, {})
 
-        # gjej user admin
-        admin_user = User.objects.get(username="admin")
-        organisation = admin_user.userprofile
-
-        # gjej ose krijo agent
-        agent, _ = Agent.objects.get_or_create(user=admin_user, organisation=organisation)
-
-        # gjej ose krijo kategori NEW
-        new_category, _ = Category.objects.get_or_create(
-            name="New", organisation=organisation
-        )
-
-        Lead.objects.create(
-            first_name=first_name,
-            last_name=last_name,
-            email=email,
-            phone_number=phone_number,
-            age=age,
-            organisation=organisation,
-            agent=agent,
-            category=new_category,
-        )
-
+        data["service"] = (request.POST.get("service") or "")[:100]
+        enqueue_submission(data)
         messages.success(request, "New lead just came!")
         return redirect("leads:thank-you")
 
@@ -748,45 +752,93 @@ class ThankYouView(generic.TemplateView):
     
 
 
+def adjacent_lead_id(request, pk, reverse=False):
+    """
+    Gjen lead-in pas (ose para) `pk` me filtrat/renditjen e fundit të listës,
+    me një query keyset mbi indeksin në vend të një liste id-sh në sesion.
+    """
+    params = QueryDict(request.session.get("last_leads_query", ""))
+    ordering = get_ordering(params)
+    queryset = visible_leads(request.user, params)
+
+    names = [field.lstrip("-") for field in ordering]
+    current = queryset.filter(pk=pk).values(*names).first()
+    if current is None:
+        return None
+
+    ids = seek(queryset, ordering, row_values(current, ordering), reverse=reverse)
+    next_id = ids.values_list("id", flat=True).first()
+    if next_id is None:
+        # rikthehet tek i pari (ose tek i fundit) nëse s’ka më
+        ids = queryset.reverse() if reverse else queryset
+        next_id = ids.values_list("id", flat=True).first()
+    return next_id
+
+
 @login_required
 def lead_next(request, pk):
-    lead_ids = request.session.get("visible_leads", [])
-    pk = int(pk)
-    if pk not in lead_ids:
+    next_id = adjacent_lead_id(request, pk)
+    if next_id is None:
         return redirect("leads:lead-list")
-
-    current_index = lead_ids.index(pk)
-    if current_index + 1 < len(lead_ids):
-        next_id = lead_ids[current_index + 1]
-    else:
-        next_id = lead_ids[0]  # rikthehet tek i pari nëse s’ka më
     return redirect("leads:lead-detail", pk=next_id)
 
 
 @login_required
 def lead_prev(request, pk):
-    lead_ids = request.session.get("visible_leads", [])
-    pk = int(pk)
-    if pk not in lead_ids:
+    prev_id = adjacent_lead_id(request, pk, reverse=True)
+    if prev_id is None:
         return redirect("leads:lead-list")
-
-    current_index = lead_ids.index(pk)
-    if current_index - 1 >= 0:
-        prev_id = lead_ids[current_index - 1]
-    else:
-        prev_id = lead_ids[-1]  # shkon tek i fundit nëse është tek i pari
     return redirect("leads:lead-detail", pk=prev_id)
 
 
 
 
+FEED_MAX_WAIT = 25  # sekonda; nën timeout-in e zakonshëm të proxy-ve (30-60s)
+
+
 @login_required
 @require_GET
-def notifications_feed(request):
+@cache_control(private=True, no_cache=True)
+async def notifications_feed(request):
     """
     Kthen njoftime të REJA pas 'since' (ISO8601).
     Nëse s’ka 'since', kthen 10 të fundit të palexuara.
+    Pa ndryshime që nga përgjigjja e fundit (If-None-Match) kthen 304.
+
+    Me ?wait=<sekonda> (long-poll), kur s'ka asgjë të re kërkesa pret deri në
+    `wait` sekonda dhe përgjigjet sapo broker-i publikon një njoftim për userin.
+    Vetëm nën ASGI; nën WSGI `wait` injorohet. Header-i X-Poll-Wait tregon
+    sa sekonda u prit në të vërtetë (0 nën WSGI).
     """
+    # login_required e ka lexuar tashmë me auser(); pa këtë request.user bën një query të dytë
+    request.user = user = await request.auser()
+    try:
+        wait = float(request.GET.get("wait", 0))
+    except ValueError:
+        wait = 0
+    wait = min(wait, FEED_MAX_WAIT) if wait > 0 else 0  # edhe "nan"
+    if not isinstance(request, ASGIRequest):
+        # nën WSGI pritja do të zinte një worker sinkron për çdo tab të hapur
+        wait = 0
+    if wait:
+        # abonohemi para se të lexojmë DB-në, që të mos humbasë asgjë në mes
+        subscription = get_broker().subscribe(user_channel(user.pk))
+        try:
+            response = await sync_to_async(feed_response)(request)
+            if response.status_code == 304 or not getattr(response, "item_count", 0):
+                if await subscription.aget(timeout=wait) is not None:
+                    response = await sync_to_async(feed_response)(request)
+        finally:
+            subscription.close()
+    else:
+        response = await sync_to_async(feed_response)(request)
+    # klienti e sheh këtu nëse serveri e mbajti kërkesën, që të vendosë sa të presë para tjetrës
+    response["X-Poll-Wait"] = f"{wait:g}"
+    return response
+
+
+@condition(etag_func=feed_etag)
+def feed_response(request):
     since_iso = request.GET.get("since")
     qs = Notification.objects.filter(user=request.user).order_by("-created_at")
 
@@ -799,20 +851,92 @@ def notifications_feed(request):
     else:
         qs = qs.filter(read=False)
 
-    items = [{
-        "id": n.id,
-        "message": n.message,
-        "url": n.url or "",
-        "created_at": n.created_at.isoformat(),
-        "read": n.read,
-    } for n in qs[:10]]
+    items = [serialize_notification(n) for n in qs[:10]]
 
-    return JsonResponse({
+    response = JsonResponse({
         "count": len(items),
         "items": items,
         "server_time": now().isoformat(),
         "csrf_token": get_token(request),
     })
+    response.item_count = len(items)
+    return response
+
+
+@login_required
+@require_GET
+def lead_autocomplete(request):
+    """
+    ?q=<prefiks>&limit=8 → leads e organizatës me emër, email ose telefon
+    që fillon me prefiksin. Agjenti sheh vetëm leads e veta.
+    """
+    tenant = request.tenant
+    if not tenant:
+        return JsonResponse({"results": []})
+    organisation_id, agent_id = tenant.organisation_id, tenant.agent_id
+
+    limit = request.GET.get("limit", "")
+    results = autocomplete(
+        organisation_id,
+        request.GET.get("q", ""),
+        limit=int(limit) if limit.isdigit() else 8,
+        agent_id=agent_id,
+    )
+    return JsonResponse({"results": [
+        {**result, "url": reverse("leads:lead-detail", args=[result["id"]])}
+        for result in results
+    ]})
+
+
+STREAM_HEARTBEAT = 15  # sekonda
+
+
+@login_required
+@require_GET
+async def notifications_stream(request):
+    """
+    Server-Sent Events: dërgon çdo njoftim të ri sapo krijohet.
+    Kërkon ASGI (djcrm/asgi.py); nën WSGI kthen 204 dhe klienti kalon në polling.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    response = StreamingHttpResponse(
+        notification_events(user.pk, int(last_event_id) if last_event_id.isdigit() else None),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx të mos e mbajë në buffer
+    return response
+
+
+def sse_event(item):
+    return f"id: {item['id']}\nevent: notification\ndata: {json.dumps(item)}\n\n"
+
+
+async def notification_events(user_id, last_event_id=None):
+    # abonohemi para se të lexojmë DB-në, që të mos humbasë asgjë në mes
+    subscription = get_broker().subscribe(user_channel(user_id))
+    try:
+        yield "retry: 5000\n\n"
+        if last_event_id is not None:
+            # rilidhje: dërgo ato që u krijuan ndërkohë
+            missed = await sync_to_async(list)(
+                Notification.objects.filter(user_id=user_id, id__gt=last_event_id).order_by("id")[:20]
+            )
+            for notification in missed:
+                yield sse_event(serialize_notification(notification))
+
+        while True:
+            item = await subscription.aget(timeout=STREAM_HEARTBEAT)
+            if item is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield sse_event(item)
+    finally:
+        subscription.close()
 
 
 @login_required
@@ -828,22 +952,17 @@ def notifications_mark_read(request):
         Notification.objects.filter(user=request.user, read=False).update(read=True)
     elif ids:
         Notification.objects.filter(user=request.user, id__in=ids).update(read=True)
+    # update() nuk lëshon post_save, ndaj cache-i fshihet këtu
+    invalidate_summary(request.user.pk)
 
     return JsonResponse({"ok": True})
 
 
 @receiver(post_save, sender=Lead)
 def notify_new_lead(sender, instance, created, **kwargs):
-    if not created:
-        return
-    admin_user = instance.organisation.user
-    Notification.objects.create(
-        user=admin_user,
-        message=f"New lead: {instance.first_name} {instance.last_name}",
-        url=reverse("leads:lead-detail", kwargs={"pk": instance.pk}),
-    )
-  
-
+    # bulk_create (importi, forma publike) njofton vetë me notify_new_leads
+    if created:
+        notifications.notify_new_leads(instance.organisation.user_id, [instance])
 
 
 @login_required